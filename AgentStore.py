@@ -0,0 +1,132 @@
+# Author: Peyton J. Hall
+"""
+A module to hold every simulated visitor in contiguous NumPy arrays.
+Each attribute of a visitor (position, route, progress, color) is its own
+array and a visitor is a row index, so a frame moves every visitor at once.
+"""
+
+import numpy as np
+
+"""
+Struct-of-arrays store for the people walking through LifeTime Savage.
+A route is kept only as its key points plus the frame each key point is
+reached; positions in between are computed on demand in step().
+Rows are handed out as people arrive and retired as they leave; a
+retired row goes onto a free list and is reused by the next arrival, so
+rows never move and neither spawning nor retiring scans the store.
+"""
+class AgentStore:
+	def __init__(self, waypoint_count, capacity = 64):
+		self.waypoint_count = waypoint_count # Number of key points on every route
+		self.size = 0 # Number of rows in use, alive or dead
+		self.count = 0 # Number of alive rows
+		self.free = [] # Retired rows waiting to be reused, used as a stack
+		self.next_id = 0 # ID the next person spawned gets; IDs are never reused, unlike rows
+		self._allocate(max(1, capacity))
+
+	""" Allocates empty arrays able to hold capacity people """
+	def _allocate(self, capacity):
+		self.capacity = capacity
+		self.id = np.zeros(capacity, dtype = np.int64) # ID of the person in each row
+		self.position = np.zeros((capacity, 3)) # Current (x, y, z) of each person
+		self.waypoints = np.zeros((capacity, self.waypoint_count, 3), dtype = np.float32) # Key points of each route
+		self.arrival = np.zeros((capacity, self.waypoint_count), dtype = np.float32) # Frame each key point is reached
+		self.waypoint_index = np.zeros(capacity, dtype = np.int32) # Segment each person is walking
+		self.progress = np.zeros(capacity, dtype = np.float32) # Frames since the person arrived
+		self.born = np.zeros(capacity, dtype = np.int64) # Frame the person arrived on
+		self.color = np.zeros((capacity, 3), dtype = np.float32) # RGB color of each person
+		self.alive = np.zeros(capacity, dtype = bool) # Whether the row holds a person
+		self.held = np.zeros(capacity, dtype = bool) # Whether the person is standing still, e.g. queueing at the desk
+
+	""" Every per-person array, in a fixed order """
+	def _arrays(self):
+		return (self.id, self.position, self.waypoints, self.arrival, self.waypoint_index, self.progress, self.born, self.color, self.alive, self.held)
+
+	""" Memory used by one row of the store """
+	def bytes_per_agent(self):
+		return sum(array.nbytes for array in self._arrays()) // self.capacity
+
+	""" Doubles the capacity, keeping the rows already in use """
+	def _grow(self):
+		old = self._arrays()
+		self._allocate(self.capacity * 2)
+		for source, target in zip(old, self._arrays()):
+			target[:self.size] = source[:self.size]
+
+	"""
+	Adds a person walking the given key points and returns their row.
+	segment_frames is how many frames each segment between two key points
+	takes, either one number for every segment or one number per segment.
+	frame is the simulation frame the person arrives on.
+	"""
+	def spawn(self, waypoints, color, segment_frames, frame = 0):
+		return self.spawn_many(np.asarray(waypoints)[None], np.asarray(color)[None], segment_frames, frame)[0]
+
+	"""
+	Adds one person per route in waypoints, an (N, waypoint_count, 3) array,
+	with colors an (N, 3) array, in a few array writes. Retired rows are
+	reused first, in the order spawn() would reuse them. Returns the rows.
+	"""
+	def spawn_many(self, waypoints, colors, segment_frames, frame = 0):
+		count = len(waypoints)
+		reused = min(count, len(self.free))
+		rows = self.free[len(self.free) - reused:][::-1] # Reuse the rows of people who left, last retired first
+		del self.free[len(self.free) - reused:]
+		while self.size + count - reused > self.capacity:
+			self._grow()
+		rows = np.array(rows + list(range(self.size, self.size + count - reused)), dtype = np.intp)
+		self.size += count - reused
+		self.id[rows] = np.arange(self.next_id, self.next_id + count)
+		self.next_id += count
+		self.waypoints[rows] = waypoints
+		self.arrival[rows, 0] = 0
+		self.arrival[rows, 1:] = np.cumsum(np.broadcast_to(segment_frames, (self.waypoint_count - 1,)))
+		self.position[rows] = waypoints[:, 0]
+		self.waypoint_index[rows] = 0
+		self.progress[rows] = 0
+		self.born[rows] = frame
+		self.color[rows] = colors
+		self.alive[rows] = True
+		self.held[rows] = False
+		self.count += count
+		return rows
+
+	"""
+	Moves every alive person who is not held frames frames along their route.
+	The position is found from the segment being walked and the fraction
+	of it already covered. Several frames at once leave everybody where the
+	same frames taken one at a time would, so the drawing keeps up with the
+	clock. Returns the rows that finished their route; they stay alive until
+	they are retired.
+	"""
+	def step(self, frames = 1):
+		rows = np.flatnonzero(self.alive[:self.size] & ~self.held[:self.size])
+		last = self.waypoint_count - 1
+		if frames > 1:
+			self.progress[rows] += frames - 1 # Positions are those of the last of the frames
+		time = self.progress[rows]
+		index = self.waypoint_index[rows]
+		passed = rows[(index < last - 1) & (time >= self.arrival[rows, index + 1])]
+		while len(passed): # Usually a single pass; more only when a segment is shorter than a frame
+			self.waypoint_index[passed] += 1
+			index = self.waypoint_index[passed]
+			passed = passed[(index < last - 1) & (self.progress[passed] >= self.arrival[passed, index + 1])]
+
+		index = self.waypoint_index[rows]
+		start, end = self.arrival[rows, index], self.arrival[rows, index + 1]
+		fraction = np.clip((time - start) / np.maximum(end - start, 1e-6), 0, 1)
+		origin = self.waypoints[rows, index]
+		self.position[rows] = origin + (self.waypoints[rows, index + 1] - origin) * fraction[:, None] # Linear interpolation
+
+		self.progress[rows] += 1
+		return rows[self.progress[rows] >= self.arrival[rows, last]]
+
+	""" Marks rows as empty and puts them on the free list for the next arrivals """
+	def retire(self, rows):
+		self.alive[rows] = False
+		self.count -= len(rows)
+		self.free.extend(rows.tolist())
+
+	""" Indices of the rows holding a person """
+	def alive_rows(self):
+		return np.flatnonzero(self.alive[:self.size])
@@ -0,0 +1,169 @@
+# Author: Peyton J. Hall
+"""
+A module to benchmark the gym traffic simulation.
+It measures how long the scene takes to build, how long one tick of the
+engine and of the animation update takes at several crowd sizes, how many
+bytes each person costs, and how long a frame takes to render with Agg.
+Results are written to a JSON file so runs on different commits can be compared.
+
+Usage: python Benchmark.py [--agents 50 500 5000] [--output benchmark_results.json] [--compare old.json]
+"""
+
+import os
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tracemalloc
+import warnings
+import statistics
+
+""" Median wall time in milliseconds of calling function repeat times """
+def time_ms(function, repeat):
+	samples = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		function()
+		samples.append((time.perf_counter() - start) * 1000)
+	return statistics.median(samples)
+
+""" Commit being benchmarked, or None outside a git checkout """
+def git_commit():
+	try:
+		return subprocess.run(["git", "rev-parse", "HEAD"], capture_output = True, text = True, check = True,
+			cwd = os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+""" Builds an engine already holding count people spread along their routes """
+def crowded_engine(count, seed = 0):
+	from TrafficEngine import GymTrafficEngine
+	engine = GymTrafficEngine(seed = seed, frame_interval = 50)
+	engine.add_people(count)
+	route_ticks = engine.frame_interval * (engine.people.waypoint_count - 1)
+	engine.people.progress[:count] = engine.random.uniform(0, route_ticks - 100, count)
+	return engine
+
+""" Wall time of building the whole scene, as lifetime_savage() does before showing it """
+def benchmark_startup(repeat):
+	import matplotlib.pyplot as plt
+	from LifeTimeSavage import lifetime_savage, savage_scene
+
+	def build_scene():
+		fig = plt.figure()
+		savage_scene(fig.add_subplot(111, projection = "3d"))
+		plt.close(fig)
+
+	def build_and_draw():
+		fig = plt.figure()
+		savage_scene(fig.add_subplot(111, projection = "3d"))
+		fig.canvas.draw()
+		plt.close(fig)
+
+	def open_window():
+		lifetime_savage() # plt.show() returns immediately on Agg
+		plt.close("all")
+
+	return {
+		"scene_build_ms": time_ms(build_scene, repeat),
+		"scene_first_draw_ms": time_ms(build_and_draw, repeat),
+		"lifetime_savage_ms": time_ms(open_window, repeat)
+	}
+
+""" Per-tick and per-frame costs with count people on the floor """
+def benchmark_crowd(count, repeat):
+	import matplotlib.pyplot as plt
+	from LifeTimeSavage import savage_scene
+	from CrowdRenderer import CrowdRenderer
+
+	result = {"agents": count}
+	engine = crowded_engine(count)
+	result["engine_step_ms"] = time_ms(engine.step, repeat)
+
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	measured = crowded_engine(count)
+	result["bytes_per_agent"] = (tracemalloc.get_traced_memory()[0] - before) / count
+	tracemalloc.stop()
+	result["store_bytes_per_agent"] = measured.people.bytes_per_agent()
+
+	# Prisms drawn through one collection or one collection each, and the point markers used when zoomed out
+	for mode in ("batched", "individual", "markers"):
+		if mode == "individual" and count > 500:
+			continue # One artist per person is too slow to be worth timing at this size
+		fig = plt.figure()
+		ax = fig.add_subplot(111, projection = "3d")
+		savage_scene(ax)
+		renderer = CrowdRenderer(ax, crowded_engine(count), "individual" if mode == "individual" else "batched", blit = True, lod = mode == "markers")
+		renderer.update(0)
+		fig.canvas.draw()
+		result[f"{mode}_update_ms"] = time_ms(lambda: renderer.update(0), repeat)
+		result[f"{mode}_full_frame_ms"] = time_ms(lambda: (renderer.update(0), fig.canvas.draw()), repeat)
+
+		# A blitted frame: restore the cached static scene and draw only the people
+		animated = renderer.animated_artists()
+		for artist in animated:
+			artist.set_animated(True)
+		fig.canvas.draw()
+		background = fig.canvas.copy_from_bbox(fig.bbox)
+
+		def blit_frame():
+			fig.canvas.restore_region(background)
+			for artist in renderer.update(0):
+				artist.set_animated(True)
+				ax.draw_artist(artist)
+
+		result[f"{mode}_blit_frame_ms"] = time_ms(blit_frame, repeat)
+		plt.close(fig)
+	return result
+
+""" Prints how each timing changed between two result files """
+def compare(old, new):
+	print(f"{'measurement':<40}{'old':>12}{'new':>12}{'change':>10}")
+	for key, value in new["startup"].items():
+		if key in old.get("startup", {}):
+			name = f"startup.{key}"
+			print(f"{name:<40}{old['startup'][key]:>12.2f}{value:>12.2f}{value / old['startup'][key] - 1:>+10.0%}")
+	previous = {run["agents"]: run for run in old.get("crowds", [])}
+	for run in new["crowds"]:
+		for key, value in run.items():
+			if key != "agents" and key in previous.get(run["agents"], {}):
+				before = previous[run["agents"]][key]
+				name = f"{run['agents']} agents.{key}"
+				print(f"{name:<40}{before:>12.2f}{value:>12.2f}{value / before - 1:>+10.0%}")
+
+def main(arguments = None):
+	parser = argparse.ArgumentParser(description = "Benchmark the LifeTime Savage gym traffic simulation.")
+	parser.add_argument("--agents", type = int, nargs = "+", default = [50, 500, 5000], help = "crowd sizes to time")
+	parser.add_argument("--repeat", type = int, default = 20, help = "repetitions per measurement (the median is kept)")
+	parser.add_argument("--output", default = "benchmark_results.json", help = "JSON file to write the results to")
+	parser.add_argument("--compare", help = "earlier results file to compare against")
+	options = parser.parse_args(arguments)
+
+	import matplotlib
+	matplotlib.use("Agg") # Measure rendering without a window
+	import numpy
+	warnings.filterwarnings("ignore", message = "Animation was deleted") # lifetime_savage() on Agg never animates
+
+	results = {
+		"commit": git_commit(),
+		"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+		"python": platform.python_version(),
+		"numpy": numpy.__version__,
+		"matplotlib": matplotlib.__version__,
+		"machine": platform.platform(),
+		"repeat": options.repeat,
+		"startup": benchmark_startup(max(1, options.repeat // 4)),
+		"crowds": [benchmark_crowd(count, options.repeat) for count in options.agents]
+	}
+	with open(options.output, "w") as output:
+		json.dump(results, output, indent = 2)
+	print(json.dumps(results, indent = 2))
+
+	if options.compare:
+		with open(options.compare) as old:
+			compare(json.load(old), results)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,150 @@
+# Author: Peyton J. Hall
+"""
+A module to model the front check-in desk as a queue with several staff.
+People join one first-come, first-served line; each free member of staff
+takes the next person and serves them for a time drawn from a service-time
+distribution. The line is a ring buffer of NumPy arrays, so bursts of
+arrivals at peak hours only cost a few array writes. Queue length, waits,
+throughput and staff utilization are kept per hour of the day.
+"""
+
+import math
+import random
+import numpy as np
+
+"""
+Service-time distributions by name. Each takes the random stream, the mean
+service time in seconds and a spread: the coefficient of variation for
+"lognormal", and the relative half-width for "uniform".
+"""
+SERVICE_TIMES = {
+	"fixed": lambda stream, mean, spread: mean,
+	"exponential": lambda stream, mean, spread: stream.expovariate(1 / mean),
+	"lognormal": lambda stream, mean, spread: stream.lognormvariate(
+		math.log(mean) - math.log(1 + spread ** 2) / 2, math.sqrt(math.log(1 + spread ** 2))),
+	"uniform": lambda stream, mean, spread: stream.uniform(mean * (1 - spread), mean * (1 + spread))
+}
+
+"""
+Multi-server check-in desk with servers members of staff. service is the
+name of one of SERVICE_TIMES, or a function of the random stream returning
+seconds. Times are seconds after midnight; join() and advance() must be
+called with non-decreasing times.
+"""
+class CheckinQueue:
+	def __init__(self, servers = 2, service = "exponential", mean_service = 30.0, spread = 0.5, seed = None):
+		self.servers = servers
+		if callable(service):
+			self.service = service
+		else:
+			distribution = SERVICE_TIMES[service]
+			self.service = lambda stream: distribution(stream, mean_service, spread)
+		self.random = random.Random(seed)
+		# The line, as a ring buffer: who is waiting and since when
+		self.waiting = np.zeros(64, dtype = np.int64)
+		self.joined = np.zeros(64)
+		self.head = 0 # Index of the first person in line
+		self.length = 0 # Number of people in line
+		# Each member of staff: who they are serving (-1 when free) and until when, or since when they are free
+		self.serving = np.full(servers, -1, dtype = np.int64)
+		self.until = np.zeros(servers)
+		# Hourly statistics
+		self.last = None # Time the statistics were last brought up to date
+		self.queue_seconds = np.zeros(24) # Time-weighted queue length, summed over each hour
+		self.busy_seconds = np.zeros(24) # Staff-seconds spent serving
+		self.longest = np.zeros(24, dtype = int) # Longest line seen
+		self.served = np.zeros(24, dtype = int) # People whose check-in finished
+		self.wait_seconds = np.zeros(24) # Total wait of the people who reached the desk in each hour
+		self.started = np.zeros(24, dtype = int) # Number of people who reached the desk
+		self.waits = [] # Every wait in seconds, for percentiles
+
+	""" Credits the line and the busy staff for the time since the last change, hour by hour """
+	def _integrate(self, now):
+		busy = np.count_nonzero(self.serving >= 0)
+		while self.last is not None and self.last < now:
+			hour = int(self.last // 3600)
+			until = min(now, (hour + 1) * 3600)
+			self.queue_seconds[hour % 24] += self.length * (until - self.last)
+			self.busy_seconds[hour % 24] += busy * (until - self.last)
+			self.last = until
+		self.last = now
+
+	""" Doubles the ring buffer, unrolling it to start at index 0 """
+	def _grow(self):
+		order = (self.head + np.arange(self.length)) % len(self.waiting)
+		self.waiting = np.concatenate([self.waiting[order], np.zeros(len(self.waiting), dtype = np.int64)])
+		self.joined = np.concatenate([self.joined[order], np.zeros(len(self.joined))])
+		self.head = 0
+
+	""" Adds the given people to the back of the line at time now """
+	def join(self, visitors, now):
+		self._integrate(now)
+		visitors = np.atleast_1d(visitors)
+		while self.length + len(visitors) > len(self.waiting):
+			self._grow()
+		slots = (self.head + self.length + np.arange(len(visitors))) % len(self.waiting)
+		self.waiting[slots] = visitors
+		self.joined[slots] = now
+		self.length += len(visitors)
+		hour = int(now // 3600) % 24
+		self.longest[hour] = max(self.longest[hour], self.length)
+
+	"""
+	Serves the line up to time now, in the order things happen: staff
+	finish with people and take the next in line as soon as they are free.
+	Returns the people whose check-in finished, in the order they finished.
+	"""
+	def advance(self, now):
+		done = []
+		while True:
+			busy = self.serving >= 0
+			finishing = np.where(busy, self.until, np.inf)
+			first = int(np.argmin(finishing))
+			free = np.where(busy, np.inf, self.until)
+			next_free = int(np.argmin(free))
+			start = max(free[next_free], self.joined[self.head]) if self.length else np.inf
+			if min(finishing[first], start) > now:
+				break
+			if finishing[first] <= start: # Somebody is done at the desk
+				self._integrate(finishing[first])
+				done.append(self.serving[first])
+				self.served[int(finishing[first] // 3600) % 24] += 1
+				self.serving[first] = -1
+			else: # The next in line steps up to a free member of staff
+				self._integrate(start)
+				visitor, joined = self.waiting[self.head], self.joined[self.head]
+				self.head = (self.head + 1) % len(self.waiting)
+				self.length -= 1
+				hour = int(start // 3600) % 24
+				self.wait_seconds[hour] += start - joined
+				self.started[hour] += 1
+				self.waits.append(start - joined)
+				self.serving[next_free] = visitor
+				self.until[next_free] = start + self.service(self.random)
+		self._integrate(now)
+		return np.array(done, dtype = np.int64)
+
+	""" Time the desk next changes on its own (somebody finishes), or inf """
+	def next_change(self):
+		return float(np.min(np.where(self.serving >= 0, self.until, np.inf)))
+
+	""" People in line, front first """
+	def line(self):
+		return self.waiting[(self.head + np.arange(self.length)) % len(self.waiting)]
+
+	""" Queue length, waits, throughput and utilization per hour of the day, as plain Python values """
+	def summary(self):
+		waits = np.array(self.waits)
+		return {
+			"servers": self.servers,
+			"mean_queue_per_hour": (self.queue_seconds / 3600).round(2).tolist(),
+			"longest_queue_per_hour": self.longest.tolist(),
+			"mean_wait_seconds_per_hour": np.round(self.wait_seconds / np.maximum(self.started, 1), 1).tolist(),
+			"served_per_hour": self.served.tolist(),
+			"utilization_per_hour": (self.busy_seconds / (3600 * self.servers)).round(3).tolist(),
+			"wait_seconds": {
+				"mean": float(waits.mean()) if len(waits) else 0.0,
+				"p95": float(np.percentile(waits, 95)) if len(waits) else 0.0,
+				"max": float(waits.max()) if len(waits) else 0.0
+			}
+		}
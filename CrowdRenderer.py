@@ -0,0 +1,196 @@
+# Author: Peyton J. Hall
+"""
+A module to draw the people of a GymTrafficEngine on a 3D matplotlib axes.
+It is a thin adapter: all of the movement happens in the engine, and this
+module only turns the engine's arrays into prisms each frame.
+"""
+
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+""" Function to create a rectangular prism (representing the person) """
+def create_prism(position, height = 1.82, width = 0.5, depth = 0.3):
+	x, y, z = position  # Unpack the position tuple into x, y, z coordinates
+	vertices = np.array([
+		[x, y, z], [x + width, y, z], [x + width, y + depth, z], [x, y + depth, z],
+		[x, y, z + height], [x + width, y, z + height], [x + width, y + depth, z + height], [x, y + depth, z + height]
+	])
+	# Define faces of the prism using vertices
+	faces = [
+		[vertices[j] for j in [0, 1, 5, 4]], [vertices[j] for j in [7, 6, 2, 3]],
+		[vertices[j] for j in [0, 1, 2, 3]], [vertices[j] for j in [4, 5, 6, 7]],
+		[vertices[j] for j in [0, 3, 7, 4]], [vertices[j] for j in [1, 2, 6, 5]]
+	]
+	return faces
+
+# Corners of a person's prism relative to their position, and the corners of each of its 6 faces
+PRISM_OFFSETS = np.array([
+	[0, 0, 0], [0.5, 0, 0], [0.5, 0.3, 0], [0, 0.3, 0],
+	[0, 0, 1.82], [0.5, 0, 1.82], [0.5, 0.3, 1.82], [0, 0.3, 1.82]
+])
+PRISM_FACES = np.array([[0, 1, 5, 4], [7, 6, 2, 3], [0, 1, 2, 3], [4, 5, 6, 7], [0, 3, 7, 4], [1, 2, 6, 5]])
+PRISM_CENTER = PRISM_OFFSETS.mean(axis = 0) # Where a person's marker is drawn when they are too small for a prism
+
+""" Vectorized create_prism: the faces of every prism as one (N*6, 4, 3) vertex buffer """
+def create_prisms(positions):
+	vertices = positions[:, None, :] + PRISM_OFFSETS # (N, 8, 3) corners
+	return vertices[:, PRISM_FACES].reshape(-1, 4, 3)
+
+"""
+Everybody drawn at once on ax, as one collection of prisms or, with lod,
+as one layer of point markers while there are more than detail_agents
+people or the view spans more than detail_extent meters. Prisms come back
+once the view is zoomed into the floor, where they are big enough to see.
+"""
+class CrowdLayer:
+	def __init__(self, ax, lod = True, detail_agents = 2000, detail_extent = 40.0):
+		self.ax = ax
+		self.lod = lod
+		self.detail_agents = detail_agents # Most people drawn as prisms
+		self.detail_extent = detail_extent # Widest view, in meters, people are drawn as prisms in
+		self.prisms = Poly3DCollection(np.empty((0, 4, 3)))
+		ax.add_collection3d(self.prisms)
+		self.markers = ax.scatter([], [], [], s = 6, depthshade = False, visible = False)
+
+	""" Both layers; only the one in use is visible """
+	def artists(self):
+		return [self.prisms, self.markers]
+
+	""" Whether count people are few enough, and the view close enough, to draw them as prisms """
+	def detailed(self, count):
+		if not self.lod:
+			return True
+		extent = max(np.ptp(self.ax.get_xlim()), np.ptp(self.ax.get_ylim()))
+		return count <= self.detail_agents and extent <= self.detail_extent
+
+	""" Draws people at (N, 3) positions with (N, 3) RGB colors, at the level of detail the view calls for """
+	def draw(self, positions, colors):
+		face_colors = np.empty((len(positions), 4))
+		face_colors[:, :3] = colors
+		face_colors[:, 3] = 0.7
+		detailed = self.detailed(len(positions))
+		if detailed:
+			self.prisms.set_verts(create_prisms(positions)) # One vertex buffer for everybody
+			face_colors = np.repeat(face_colors, 6, axis = 0) # Each person's color on their 6 faces
+			self.prisms.set_facecolor(face_colors)
+			self.prisms.set_edgecolor(face_colors)
+		else:
+			centers = positions + PRISM_CENTER
+			self.markers.set_offsets(centers[:, :2])
+			self.markers.set_3d_properties(centers[:, 2], "z")
+			self.markers.set_facecolor(face_colors)
+			self.markers.set_edgecolor(face_colors)
+		self.prisms.set_visible(detailed)
+		self.markers.set_visible(not detailed)
+
+"""
+Draws an engine's people on ax. render_mode is "batched" to draw every
+person through one collection, or "individual" to give each person a
+collection of their own; those collections are pooled by row, hidden
+when a person leaves and shown again for whoever reuses the row. With blit, only the people and the legend are
+redrawn each frame, over a cached image of the static scene.
+With time_scale, every frame advances the engine that many simulated
+seconds (coalescing ticks when coalesce allows it) instead of one tick.
+In batched mode, lod switches everybody to point markers when there are
+many people or the view is zoomed out (see CrowdLayer).
+When the engine has a profiler, matplotlib drawing is timed as well and
+the legend shows the rolling frame time.
+"""
+class CrowdRenderer:
+	def __init__(self, ax, engine, render_mode = "batched", blit = False, lod = True, detail_agents = 2000, detail_extent = 40.0, time_scale = None, coalesce = False):
+		self.ax = ax
+		self.engine = engine
+		self.render_mode = render_mode
+		self.blit = blit
+		self.time_scale = time_scale # Simulated seconds per frame, or None for one tick per frame
+		self.coalesce = coalesce
+		self.artists = [] # The prism pooled for each row of the store in individual mode
+		self.pending = engine.people.alive_rows().tolist() # People already in the engine, given prisms on the first update
+		# In batched mode every person is drawn by this single collection
+		if render_mode == "batched":
+			self.crowd = CrowdLayer(ax, lod, detail_agents, detail_extent)
+		# Display person count on the graph
+		self.text_handle = ax.text2D(0.05, 0.95, self.legend(), transform = ax.transAxes, fontsize = 12)
+		profiler = engine.profiler
+		if profiler is not None:
+			# Full redraws go through Figure.draw and blitted artists through Axes.draw_artist
+			figure = ax.get_figure()
+			figure.draw = profiler.timed_draw(figure.draw)
+			ax.draw_artist = profiler.timed_draw(ax.draw_artist)
+
+	""" Legend function to display person count """
+	def legend(self):
+		text = f"Person count: {self.engine.people.count}" # A string with the current person count
+		if self.engine.day is not None: # Followed by the simulated day and time
+			minutes = int(self.engine.clock() // 60)
+			text += f"\n{self.engine.day.title()} {minutes // 60 % 24:02d}:{minutes % 60:02d}"
+		if self.engine.profiler is not None: # Followed by the rolling frame time
+			frame = self.engine.profiler.summary().get("frame")
+			if frame is not None:
+				text += f"\nFrame p50 {frame['p50']:.1f} ms, p95 {frame['p95']:.1f} ms, max {frame['max']:.1f} ms"
+		return text
+
+	""" The artists that change every frame; FuncAnimation redraws only these when blitting """
+	def animated_artists(self):
+		if self.render_mode == "batched":
+			return self.crowd.artists() + [self.text_handle]
+		return [artist for artist in self.artists if artist is not None and artist.get_visible()] + [self.text_handle]
+
+	"""
+	Update function for the animation: steps the engine once (or by
+	time_scale seconds) and redraws
+	everybody. Returns the artists to draw over the cached background.
+	"""
+	def update(self, frame):
+		people = self.engine.people
+		profiler = self.engine.profiler
+		if profiler is not None:
+			profiler.start_frame()
+		added = self.engine.person_counter
+		if self.time_scale is None:
+			finished = self.engine.step()
+		else:
+			finished = self.engine.advance(self.time_scale, self.coalesce)
+		if self.render_mode == "batched":
+			rows = people.alive_rows()
+			self.crowd.draw(people.position[rows], people.color[rows])
+		else:
+			self._update_individual(finished)
+		if added != self.engine.person_counter or len(finished) or self.engine.day is not None or profiler is not None:
+			self.text_handle.set_text(self.legend()) # Update the legend text
+		if profiler is not None:
+			profiler.lap("move")
+		animated = self.animated_artists()
+		if self.blit and self.ax.M is not None:
+			# Blitted artists skip the full figure draw, so project them onto the current camera here
+			for artist in animated[:-1]:
+				artist.do_3d_projection()
+			if profiler is not None:
+				profiler.lap("draw")
+		return animated
+
+	""" Keeps one collection per row of the store and moves each of them """
+	def _update_individual(self, finished):
+		people = self.engine.people
+		profiler = self.engine.profiler
+		self.artists.extend([None] * (people.size - len(self.artists))) # Rows the store has not used before
+		for row in finished: # People who completed their path
+			if self.artists[row] is not None: # Unless they came and went within one frame
+				self.artists[row].set_visible(False) # Hide the prism until its row is reused
+		if profiler is not None:
+			profiler.lap("retire")
+		for row in self.pending + self.engine.spawned:
+			prism = self.artists[row]
+			if prism is None:
+				# Create a 3D polygon collection
+				prism = Poly3DCollection(create_prism(people.position[row]), color = tuple(people.color[row]), alpha = 0.7)
+				self.ax.add_collection3d(prism) # Add the prism to the axes
+				self.artists[row] = prism
+			else:
+				prism.set_color(tuple(people.color[row])) # Repaint the pooled prism for its new person
+				prism.set_visible(True)
+		self.pending = []
+		if profiler is not None:
+			profiler.lap("spawn")
+		for row in people.alive_rows():
+			self.artists[row].set_verts(create_prism(people.position[row])) # Update the prism's vertices to the new position
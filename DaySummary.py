@@ -0,0 +1,34 @@
+# Author: Peyton J. Hall
+"""
+A module to report a simulated day in one form, whichever simulation ran it.
+The discrete-event simulation and the tick engine both summarize a day as
+the same dictionary of plain Python values, so days can be compared,
+merged into a week and saved as JSON.
+"""
+
+import numpy as np
+from SiteGeometry import ZONES
+
+""" Mean, median and 95th percentile of dwell times given in seconds, in minutes (all 0 when nobody left) """
+def dwell_minutes(seconds):
+	minutes = np.asarray(seconds, dtype = float) / 60
+	if len(minutes) == 0:
+		return {"mean": 0.0, "p50": 0.0, "p95": 0.0}
+	return {"mean": float(minutes.mean()), "p50": float(np.percentile(minutes, 50)), "p95": float(np.percentile(minutes, 95))}
+
+"""
+Summary of one day. arrivals (and check_ins, when counted) hold a count per
+hour of the day; person_seconds holds 24 hourly sums per zone and peak the
+most people seen in each zone, both in the order of ZONES. dwell_seconds
+is every finished visit. desk is the day's CheckinQueue, if there was one.
+"""
+def day_summary(day, visitors, arrivals, person_seconds, peak, dwell_seconds, check_ins = None, desk = None):
+	summary = {"day": day, "visitors": int(visitors), "arrivals_per_hour": np.asarray(arrivals).tolist()}
+	if check_ins is not None:
+		summary["check_ins_per_hour"] = np.asarray(check_ins).tolist()
+	summary["mean_occupancy"] = {zone: (np.asarray(seconds) / 3600).round(2).tolist() for zone, seconds in zip(ZONES, person_seconds)}
+	summary["peak_occupancy"] = {zone: int(count) for zone, count in zip(ZONES, peak)}
+	summary["dwell_minutes"] = dwell_minutes(dwell_seconds)
+	if desk is not None:
+		summary["desk"] = desk.summary()
+	return summary
@@ -0,0 +1,176 @@
+# Author: Peyton J. Hall
+"""
+A module to simulate whole days at LifeTime Savage as discrete events.
+Instead of moving everybody every tick, a priority queue holds the next
+thing that happens (an arrival, a check-in at the desk, somebody moving
+between the lot, the atrium and the gym, a departure) and time jumps
+straight to it. A week of occupancy and dwell statistics takes seconds;
+WeeklyRun.run_week() runs one, and Main.py run is its command line.
+Visitors follow the same route and timing as in GymTrafficEngine.
+"""
+
+import heapq
+import random
+import itertools
+import numpy as np
+from PopularTimes import DAYS, load_popular_times
+from SiteGeometry import ZONES
+from DaySummary import day_summary
+
+"""
+The legs of every visit after arriving in the lot, as (event, zone entered,
+route segments the leg takes): through the door into the atrium, checked in
+at the desk and onto the gym floor, the 11 stops in the gym and back to the
+desk, out the door, and back to the car.
+"""
+LEGS = [
+	("zone", "atrium", 1),
+	("check-in", "gym", 1),
+	("zone", "atrium", 12),
+	("zone", "lot", 1),
+	("departure", None, 1)
+]
+
+"""
+Time-weighted occupancy of each zone, split into the hours of the day.
+change() must be called with non-decreasing times.
+"""
+class OccupancyTally:
+	def __init__(self):
+		self.count = dict.fromkeys(ZONES, 0) # People in each zone right now
+		self.peak = dict.fromkeys(ZONES, 0)
+		self.person_seconds = {zone: np.zeros(24) for zone in ZONES} # Summed over each hour of the day
+		self.last = None # Time of the last change
+
+	""" Credits the current counts for the time since the last change, hour by hour """
+	def _integrate(self, now):
+		while self.last is not None and self.last < now:
+			hour = int(self.last // 3600)
+			until = min(now, (hour + 1) * 3600)
+			for zone in ZONES:
+				self.person_seconds[zone][hour % 24] += self.count[zone] * (until - self.last)
+			self.last = until
+		self.last = now
+
+	""" Moves one person out of leave and into enter at time now; either may be None """
+	def change(self, now, leave, enter):
+		self._integrate(now)
+		if leave is not None:
+			self.count[leave] -= 1
+		if enter is not None:
+			self.count[enter] += 1
+			self.peak[enter] = max(self.peak[enter], self.count[enter])
+
+"""
+One day as a discrete-event simulation. People arrive between start_hour
+and end_hour as a Poisson process whose rate follows the day's Popular
+Times chart (the busiest hour of the week brings peak_arrivals_per_hour).
+Every route segment takes segment_seconds, as frame_interval ticks of
+tick_seconds do in the engine. With desk (a CheckinQueue), people wait in
+line to be checked in before they go on to the gym.
+"""
+class EventSimulation:
+	def __init__(self, day, seed = None, start_hour = 6, end_hour = 23, segment_seconds = 50.0, peak_arrivals_per_hour = 300, desk = None):
+		self.day = day
+		self.random = random.Random(seed)
+		self.start, self.end = start_hour * 3600, end_hour * 3600 # Doors open and close, in seconds after midnight
+		self.segment_seconds = segment_seconds
+		self.arrival_rates = peak_arrivals_per_hour * load_popular_times()[DAYS.index(day.lower())] / 100 # Per hour
+		self.queue = [] # (time, order, event, visitor) entries
+		self.order = itertools.count() # Breaks ties between events at the same time in the order they were scheduled
+		self.now = self.start
+		self.tally = OccupancyTally()
+		self.desk = desk
+		self.desk_event = None # Time the desk is next due to be served, if scheduled
+		self.arrivals = np.zeros(24, dtype = int) # Per hour of the day
+		self.check_ins = np.zeros(24, dtype = int)
+		self.arrived = [] # Arrival time of every visitor
+		self.leg = [] # Next leg of every visitor's visit
+		self.zone = [] # Zone every visitor is in
+		self.dwell = [] # Seconds from arrival to departure of everybody who left
+		self.handlers = {"arrival": self.arrival, "zone": self.move, "check-in": self.check_in, "desk": self.serve_desk, "departure": self.departure}
+
+	def schedule(self, time, event, visitor = None):
+		heapq.heappush(self.queue, (time, next(self.order), event, visitor))
+
+	"""
+	Time of the next arrival after time, or None after closing. An
+	exponential amount of "arrival work" is drawn and the hourly rates are
+	walked through until it is used up.
+	"""
+	def next_arrival(self, time):
+		work = self.random.expovariate(1)
+		while time < self.end:
+			hour = int(time // 3600)
+			rate = self.arrival_rates[hour % 24] / 3600
+			until = min(self.end, (hour + 1) * 3600)
+			if rate * (until - time) >= work:
+				return time + work / rate
+			work -= rate * (until - time)
+			time = until
+		return None
+
+	""" Schedules the next leg of a visitor's visit """
+	def advance(self, visitor):
+		event, zone, segments = LEGS[self.leg[visitor]]
+		self.schedule(self.now + segments * self.segment_seconds, event, visitor)
+
+	""" Moves a visitor into the zone of their current leg, and on to the next leg """
+	def move(self, visitor):
+		zone = LEGS[self.leg[visitor]][1]
+		self.tally.change(self.now, self.zone[visitor], zone)
+		self.zone[visitor] = zone
+		self.leg[visitor] += 1
+		self.advance(visitor)
+
+	def arrival(self, visitor):
+		visitor = len(self.arrived)
+		self.arrived.append(self.now)
+		self.leg.append(0)
+		self.zone.append("lot")
+		self.tally.change(self.now, None, "lot")
+		self.arrivals[int(self.now // 3600) % 24] += 1
+		self.advance(visitor)
+		following = self.next_arrival(self.now)
+		if following is not None:
+			self.schedule(following, "arrival")
+
+	def check_in(self, visitor):
+		if self.desk is None:
+			self.check_ins[int(self.now // 3600) % 24] += 1
+			self.move(visitor)
+		else:
+			self.desk.join(visitor, self.now)
+			self.serve_desk()
+
+	""" Lets the desk serve up to now, sends whoever was checked in to the gym, and schedules the next finish """
+	def serve_desk(self, visitor = None):
+		for checked_in in self.desk.advance(self.now):
+			self.check_ins[int(self.now // 3600) % 24] += 1
+			self.move(int(checked_in))
+		following = self.desk.next_change()
+		if following != np.inf and following != self.desk_event:
+			self.schedule(following, "desk")
+			self.desk_event = following
+
+	def departure(self, visitor):
+		self.tally.change(self.now, self.zone[visitor], None)
+		self.zone[visitor] = None
+		self.dwell.append(self.now - self.arrived[visitor])
+
+	""" Runs the day until the last visitor has left, and returns self """
+	def run(self):
+		first = self.next_arrival(self.start)
+		if first is not None:
+			self.schedule(first, "arrival")
+		while self.queue:
+			self.now, order, event, visitor = heapq.heappop(self.queue)
+			self.handlers[event](visitor)
+		self.tally.change(self.now, None, None) # Count the time up to the last event
+		return self
+
+	""" Occupancy, dwell and desk statistics of the day as plain Python values """
+	def summary(self):
+		tally = self.tally
+		return day_summary(self.day, len(self.arrived), self.arrivals, [tally.person_seconds[zone] for zone in ZONES],
+			[tally.peak[zone] for zone in ZONES], self.dwell, check_ins = self.check_ins, desk = self.desk)
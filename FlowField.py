@@ -0,0 +1,164 @@
+# Author: Peyton J. Hall
+"""
+A module to route people through the site with precomputed flow fields.
+The site is rasterized into a navigation grid of walking costs: the lot's
+concrete and the floors are cheap, streets, curbs and anything off the site
+cost more, and walls cannot be crossed. For every key destination (the two
+atrium doors and the check-in desk) the cheapest walking distance to it is
+spread over the whole grid, and each cell keeps the neighbour that leads
+there. Routing a person is then one array lookup, whoever and wherever they are.
+The fields are cached on disk, keyed by the geometry they were built from.
+"""
+
+import os
+import hashlib
+import numpy as np
+from SiteGeometry import SITE_AREAS, FLOORS, WALLS
+
+CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flow_fields.npz")
+OFF_SITE_COST = 4 # Walk cost of cells outside every area and floor
+WALL_COST, WALL_CLEARANCE = 2, 1.0 # Extra cost of cells within the clearance of a wall, so routes keep off walls
+BLOCKED = 1e9 # Stand-in for an infinite cost where sums must stay finite
+
+# The 8 steps to a neighbouring cell as (column, row), and the unit direction of each; the last direction is "stay"
+STEPS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)])
+DIRECTIONS = np.vstack([STEPS / np.linalg.norm(STEPS, axis = 1)[:, None], [(0, 0)]])
+
+""" Whether each (x, y) point lies inside the polygon, by counting edge crossings """
+def inside_polygon(points, vertices):
+	x, y = points[..., 0], points[..., 1]
+	inside = np.zeros(x.shape, dtype = bool)
+	for (x1, y1), (x2, y2) in zip(vertices[:, :2], np.roll(vertices[:, :2], -1, axis = 0)):
+		crosses = (y1 > y) != (y2 > y)
+		with np.errstate(divide = "ignore", invalid = "ignore"): # Horizontal edges never cross
+			inside ^= crosses & (x < x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+	return inside
+
+""" Distance from each (x, y) point to the segment from start to end """
+def segment_distance(points, start, end):
+	along = end - start
+	t = np.clip(((points - start) @ along) / (along @ along), 0, 1)
+	return np.linalg.norm(points - (start + t[..., None] * along), axis = -1)
+
+"""
+Walking cost of every cell of a grid from low to high in x and y, indexed
+[row, column] with rows along y. Walls are infinite; a cell counts as wall
+when its center is within three quarters of a cell of one, and costs
+WALL_COST more when it is within WALL_CLEARANCE meters of one.
+"""
+def rasterize(cell_size = 0.5, low = -135.0, high = 135.0):
+	centers = low + (np.arange(int(np.ceil((high - low) / cell_size))) + 0.5) * cell_size
+	points = np.stack(np.meshgrid(centers, centers), axis = -1) # (row, column, xy)
+	cost = np.full(points.shape[:2], float(OFF_SITE_COST))
+	for name, color, area_cost, vertices in SITE_AREAS: # Later areas (curbs, streets) cover the concrete
+		cost[inside_polygon(points, vertices)] = area_cost
+	for floor in FLOORS:
+		cost[inside_polygon(points, floor)] = 1
+	near = np.min([segment_distance(points, start, end) for start, end in WALLS], axis = 0)
+	cost[near <= WALL_CLEARANCE] += WALL_COST
+	cost[near <= 0.75 * cell_size] = np.inf
+	return cost
+
+""" Cheapest walk along a row, given the cost of stepping onto each cell from its left neighbour """
+def scan(distance, steps):
+	walked = np.concatenate([[0], np.cumsum(steps[1:])])
+	return np.minimum(distance, walked + np.minimum.accumulate(distance - walked))
+
+"""
+Cheapest walking distance from every cell to the target cells. Rows are
+swept down and up, each taking the best of the row before it (straight or
+diagonal) and then the best along the row in both directions, until a
+pair of sweeps changes nothing. Walls and cells cut off by walls are inf.
+"""
+def distance_field(cost, targets, cell_size):
+	rows, columns = cost.shape
+	straight = cell_size * (cost[1:] + cost[:-1]) / 2 # Between a cell and the one above it
+	diagonal = np.sqrt(2) * cell_size * (cost[1:, 1:] + cost[:-1, :-1]) / 2 # Up and to the right
+	anti = np.sqrt(2) * cell_size * (cost[1:, :-1] + cost[:-1, 1:]) / 2 # Up and to the left
+	# A diagonal step may not cut the corner of a wall
+	diagonal[np.isinf(cost[1:, :-1]) | np.isinf(cost[:-1, 1:])] = np.inf
+	anti[np.isinf(cost[1:, 1:]) | np.isinf(cost[:-1, :-1])] = np.inf
+	across = np.minimum(cell_size * (cost[:, 1:] + cost[:, :-1]) / 2, BLOCKED) # Between a cell and the one to its left
+	across = np.hstack([np.zeros((rows, 1)), across])
+	backwards = np.hstack([np.zeros((rows, 1)), across[:, :0:-1]]) # The same steps, walking the row right to left
+
+	distance = np.where(targets, 0.0, np.inf)
+	while True:
+		previous = distance.copy()
+		for order, offset in ((range(1, rows), -1), (range(rows - 2, -1, -1), 1)):
+			for row in order:
+				edge = min(row, row + offset) # Index of the steps between this row and the one before it
+				before = distance[row + offset]
+				best = np.minimum(distance[row], before + straight[edge])
+				if offset == -1:
+					best[1:] = np.minimum(best[1:], before[:-1] + diagonal[edge])
+					best[:-1] = np.minimum(best[:-1], before[1:] + anti[edge])
+				else:
+					best[:-1] = np.minimum(best[:-1], before[1:] + diagonal[edge])
+					best[1:] = np.minimum(best[1:], before[:-1] + anti[edge])
+				best = scan(best, across[row])
+				distance[row] = scan(best[::-1], backwards[row])[::-1]
+		distance[np.isinf(cost) | (distance >= BLOCKED)] = np.inf
+		if np.array_equal(distance, previous):
+			return distance
+
+"""
+Index into DIRECTIONS of the step every cell takes towards the target:
+the neighbour its cheapest walk continues through, or "stay" on the
+target itself and where it cannot be reached.
+"""
+def flow_directions(distance, cost, cell_size):
+	rows, columns = distance.shape
+	padded = np.pad(distance, 1, constant_values = np.inf)
+	padded_cost = np.pad(cost, 1, constant_values = np.inf)
+	through = np.empty((len(STEPS), rows, columns))
+	for index, (column, row) in enumerate(STEPS):
+		neighbour = (slice(1 + row, 1 + row + rows), slice(1 + column, 1 + column + columns))
+		step = np.hypot(column, row) * cell_size * (cost + padded_cost[neighbour]) / 2
+		if column and row: # No cutting the corner of a wall
+			step[np.isinf(padded_cost[1 + row:1 + row + rows, 1:1 + columns]) | np.isinf(padded_cost[1:1 + rows, 1 + column:1 + column + columns])] = np.inf
+		through[index] = padded[neighbour] + step
+	best = np.argmin(through, axis = 0)
+	best[(distance == 0) | np.isinf(distance)] = len(STEPS)
+	return best.astype(np.uint8)
+
+"""
+Flow fields toward each of destinations, a list of (x, y) points, over a
+navigation grid of cell_size meters. Fields are built once and cached in
+cache; they are rebuilt whenever the site geometry, the destinations or the
+grid change. direction() is the lookup used every tick.
+"""
+class FlowFields:
+	def __init__(self, destinations, cell_size = 0.5, low = -135.0, high = 135.0, cache = CACHE):
+		self.destinations = np.asarray(destinations, dtype = float)
+		self.cell_size = cell_size
+		self.low = low
+		digest = hashlib.sha256()
+		for part in [WALLS, self.destinations, np.array([cell_size, low, high, OFF_SITE_COST, WALL_COST, WALL_CLEARANCE])] + [np.asarray(area[3], dtype = float) for area in SITE_AREAS] + FLOORS:
+			digest.update(np.ascontiguousarray(part, dtype = float).tobytes())
+		key = digest.hexdigest()
+
+		if cache is not None and os.path.exists(cache):
+			with np.load(cache) as cached:
+				if str(cached["key"]) == key:
+					self.cost, self.distance, self.codes = cached["cost"], cached["distance"], cached["codes"]
+					return
+		self.cost = rasterize(cell_size, low, high)
+		centers = low + (np.arange(len(self.cost)) + 0.5) * cell_size
+		points = np.stack(np.meshgrid(centers, centers), axis = -1)
+		self.distance = np.empty((len(self.destinations),) + self.cost.shape, dtype = np.float32)
+		self.codes = np.empty(self.distance.shape, dtype = np.uint8)
+		for index, destination in enumerate(self.destinations):
+			targets = np.linalg.norm(points - destination, axis = -1) <= cell_size # The few cells around the destination
+			distance = distance_field(self.cost, targets & np.isfinite(self.cost), cell_size)
+			self.distance[index] = distance
+			self.codes[index] = flow_directions(distance, self.cost, cell_size)
+		if cache is not None: # Written aside and moved into place, as export workers may build the fields at once
+			partial = f"{cache}.{os.getpid()}.npz"
+			np.savez_compressed(partial, key = key, cost = self.cost, distance = self.distance, codes = self.codes)
+			os.replace(partial, cache)
+
+	""" Unit direction to walk in for each (x, y) point towards its destination, given as an index into destinations """
+	def direction(self, fields, points):
+		column, row = np.clip(((points - self.low) // self.cell_size).astype(np.intp), 0, self.codes.shape[-1] - 1).T
+		return DIRECTIONS[self.codes[fields, row, column]]
@@ -0,0 +1,125 @@
+# Author: Peyton J. Hall
+"""
+A module to export the LifeTime Savage animation to video without a window.
+The timeline is split into one chunk of frames per worker process; every
+worker fast-forwards its own headless engine to the start of its chunk and
+renders its frames with the Agg backend, and the chunks are stitched at the end.
+"""
+
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+"""
+Renders frames first to last (inclusive) of the animation in this process.
+Frames are written as PNG files into folder, or piped to ffmpeg as one MP4
+chunk when video is a path. Every worker seeds its engine the same way, so
+the chunks continue each other exactly.
+"""
+def render_chunk(first, last, folder, video, seed, day, render_mode, dpi, fps, social_force, flow_fields, time_scale, coalesce, desk):
+	import matplotlib
+	matplotlib.use("Agg") # Offscreen rendering; no window or display needed
+	import matplotlib.pyplot as plt
+	from PIL import Image
+	from LifeTimeSavage import savage_scene
+	from TrafficEngine import GymTrafficEngine
+	from CheckinQueue import CheckinQueue
+	from CrowdRenderer import CrowdRenderer
+
+	fig = plt.figure(dpi = dpi)
+	ax = fig.add_subplot(111, projection = "3d")
+	savage_scene(ax)
+	queue = CheckinQueue(**desk, seed = seed) if desk is not None else None # Seeded like the engine, so the line is the same in every chunk
+	engine = GymTrafficEngine(seed = seed, day = day, social_force = social_force, flow_fields = flow_fields, desk = queue)
+	if time_scale is None:
+		engine.run(first) # Headless fast-forward to this chunk
+	else:
+		for _ in range(first): # Frame by frame, so the ticks are coalesced as the earlier chunk coalesced them
+			engine.advance(time_scale, coalesce)
+	renderer = CrowdRenderer(ax, engine, render_mode, blit = True, time_scale = time_scale, coalesce = coalesce)
+
+	# Rasterize the static scene once; every frame is then drawn over a copy of it
+	for artist in renderer.animated_artists():
+		artist.set_animated(True)
+	fig.canvas.draw()
+	background = fig.canvas.copy_from_bbox(fig.bbox)
+
+	encoder = None
+	if video is not None:
+		width, height = fig.canvas.get_width_height()
+		encoder = subprocess.Popen([
+			matplotlib.rcParams["animation.ffmpeg_path"], "-y", "-loglevel", "error",
+			"-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-",
+			"-c:v", "libx264", "-pix_fmt", "yuv420p", video
+		], stdin = subprocess.PIPE)
+
+	for frame in range(first, last + 1):
+		fig.canvas.restore_region(background)
+		for artist in renderer.update(frame):
+			artist.set_animated(True) # Individual mode adds new prisms as people arrive
+			ax.draw_artist(artist)
+		pixels = np.asarray(fig.canvas.buffer_rgba())
+		if encoder is None:
+			Image.fromarray(pixels).save(os.path.join(folder, f"frame_{frame:06d}.png"))
+		else:
+			encoder.stdin.write(pixels.tobytes())
+
+	if encoder is not None:
+		encoder.stdin.close()
+		if encoder.wait() != 0:
+			raise RuntimeError(f"ffmpeg failed while encoding {video}")
+	plt.close(fig)
+	return last - first + 1
+
+"""
+Exports frames of the animation to path. A path ending in .mp4 becomes a
+video (ffmpeg is needed to encode it); any other path is a folder of PNG
+frames named frame_000000.png onwards. The frames are split evenly across
+workers processes (one per core by default). time_scale and coalesce
+pace the simulation as in lifetime_savage(), and desk, if given, holds the
+CheckinQueue arguments of the check-in desk. Returns the path.
+"""
+def export_frames(path, frames = 1000, workers = None, seed = None, day = None, render_mode = "batched", dpi = 100, fps = 10, social_force = False, flow_fields = False, time_scale = None, coalesce = False, desk = None):
+	workers = max(1, min(workers or os.cpu_count() or 1, frames))
+	if seed is None:
+		seed = random.randrange(2**32) # One seed shared by every worker keeps the chunks continuous
+	chunks = [chunk for chunk in np.array_split(np.arange(frames), workers) if len(chunk)]
+	video = path.lower().endswith(".mp4")
+
+	if video:
+		import matplotlib
+		if shutil.which(matplotlib.rcParams["animation.ffmpeg_path"]) is None:
+			raise RuntimeError("Exporting an MP4 needs ffmpeg; export to a folder to get PNG frames instead.")
+		folder = tempfile.mkdtemp(prefix = "lifetime_savage_")
+		parts = [os.path.join(folder, f"chunk_{index:03d}.mp4") for index in range(len(chunks))]
+	else:
+		folder = path
+		os.makedirs(folder, exist_ok = True)
+		parts = [None] * len(chunks)
+
+	# Spawned workers start clean, whatever GUI backend this process has loaded
+	with ProcessPoolExecutor(max_workers = len(chunks), mp_context = multiprocessing.get_context("spawn")) as pool:
+		jobs = [
+			pool.submit(render_chunk, int(chunk[0]), int(chunk[-1]), folder, part, seed, day, render_mode, dpi, fps, social_force, flow_fields, time_scale, coalesce, desk)
+			for chunk, part in zip(chunks, parts)
+		]
+		for job in jobs:
+			job.result() # Re-raise any error from a worker
+
+	if video:
+		# Stitch the chunks end to end without re-encoding them
+		listing = os.path.join(folder, "chunks.txt")
+		with open(listing, "w") as chunk_list:
+			chunk_list.writelines(f"file '{part}'\n" for part in parts)
+		subprocess.run([
+			matplotlib.rcParams["animation.ffmpeg_path"], "-y", "-loglevel", "error",
+			"-f", "concat", "-safe", "0", "-i", listing, "-c", "copy", path
+		], check = True)
+		shutil.rmtree(folder)
+	return path
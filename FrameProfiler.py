@@ -0,0 +1,95 @@
+# Author: Peyton J. Hall
+"""
+A module to time each phase of an animation frame of the gym traffic simulation.
+A frame is split into spawning people, moving them, retiring the ones who
+left and matplotlib drawing. Timings are kept per frame, summarized over a
+rolling window (p50, p95 and max) and can be exported to CSV or JSON.
+Nothing is timed unless a FrameProfiler is attached.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+PHASES = ("spawn", "move", "retire", "draw")
+
+"""
+Collects per-phase frame times in seconds. Call start_frame() when a
+frame begins and lap(phase) after each phase; time spent outside the
+laps (such as drawing) is added with add(phase, seconds).
+"""
+class FrameProfiler:
+	def __init__(self, window = 300):
+		self.window = deque(maxlen = window) # Most recent frames, for the rolling summary
+		self.history = [] # Every finished frame, for export
+		self.frame = None # Phase times of the frame in progress
+		self.last = 0.0 # Time of the last lap
+
+	""" Finishes the frame in progress, if any, and starts timing a new one """
+	def start_frame(self):
+		self.end_frame()
+		self.frame = [0.0] * len(PHASES)
+		self.last = time.perf_counter()
+
+	""" Adds the time since the previous lap to phase """
+	def lap(self, phase):
+		now = time.perf_counter()
+		self.frame[PHASES.index(phase)] += now - self.last
+		self.last = now
+
+	""" Adds seconds measured elsewhere to phase of the frame in progress """
+	def add(self, phase, seconds):
+		if self.frame is not None:
+			self.frame[PHASES.index(phase)] += seconds
+
+	""" Stores the frame in progress """
+	def end_frame(self):
+		if self.frame is not None:
+			self.window.append(self.frame)
+			self.history.append(self.frame)
+			self.frame = None
+
+	""" Wraps a drawing function so the time it takes counts as drawing """
+	def timed_draw(self, draw):
+		def timed(*args, **kwargs):
+			start = time.perf_counter()
+			result = draw(*args, **kwargs)
+			self.add("draw", time.perf_counter() - start)
+			return result
+		return timed
+
+	""" p50, p95 and max in milliseconds of every phase and of whole frames, over the rolling window """
+	def summary(self):
+		if not self.window:
+			return {}
+		times = np.array(self.window) * 1000
+		times = np.column_stack([times, times.sum(axis = 1)])
+		p50, p95 = np.percentile(times, [50, 95], axis = 0)
+		peak = times.max(axis = 0)
+		return {
+			name: {"p50": p50[column], "p95": p95[column], "max": peak[column]}
+			for column, name in enumerate(PHASES + ("frame",))
+		}
+
+	""" One line per phase with its rolling p50, p95 and max """
+	def report(self):
+		return "\n".join(
+			f"{name:<7} p50 {stats['p50']:7.2f} ms  p95 {stats['p95']:7.2f} ms  max {stats['max']:7.2f} ms"
+			for name, stats in self.summary().items()
+		)
+
+	""" Writes every frame's phase times in milliseconds to a .csv or .json file """
+	def export(self, path):
+		self.end_frame()
+		rows = [[frame] + [seconds * 1000 for seconds in phases] for frame, phases in enumerate(self.history)]
+		if path.lower().endswith(".json"):
+			with open(path, "w") as output:
+				json.dump({"phases": list(PHASES), "frames_ms": rows, "summary": self.summary()}, output, indent = 1)
+		else:
+			with open(path, "w", newline = "") as output:
+				writer = csv.writer(output)
+				writer.writerow(("frame",) + tuple(f"{phase}_ms" for phase in PHASES))
+				writer.writerows(rows)
@@ -0,0 +1,62 @@
+# Author: Peyton J. Hall
+"""
+A module to record where people spend their time across a simulated day.
+Every tick adds everybody's position to a fixed 2D histogram over the site,
+so memory stays the same however long the run is. The histogram can be
+saved and loaded, drawn on the ground of the 3D scene or saved as an image.
+Matplotlib is only imported to draw.
+"""
+
+import numpy as np
+
+"""
+Occupancy histogram over the site from low to high in x and y (the extent
+of the 3D axes), with square cells of cell_size meters. counts holds the
+person-seconds spent in each cell, indexed [row, column] with rows along y.
+"""
+class OccupancyHeatmap:
+	def __init__(self, cell_size = 1.0, low = -135.0, high = 135.0):
+		self.cell_size = cell_size
+		self.low, self.high = low, high
+		self.columns = int(np.ceil((high - low) / cell_size)) # Cells along x and along y
+		self.counts = np.zeros((self.columns, self.columns))
+		self.seconds = 0.0 # Simulated time recorded so far
+
+	""" Adds seconds spent at each (x, y) point; points off the site are dropped """
+	def add(self, points, seconds = 1.0):
+		cells = ((points[:, :2] - self.low) // self.cell_size).astype(np.intp)
+		cells = cells[((cells >= 0) & (cells < self.columns)).all(axis = 1)]
+		# Only the cells somebody is in are touched, so a tick costs as much as its head-count
+		np.add.at(self.counts.reshape(-1), cells[:, 1] * self.columns + cells[:, 0], seconds)
+		self.seconds += seconds
+
+	""" Average number of people per square meter in each cell over the time recorded """
+	def density(self):
+		return self.counts / max(self.seconds, 1e-9) / self.cell_size ** 2
+
+	""" Saves the histogram to an .npz file, or draws it to an image file (e.g. .png) """
+	def save(self, path):
+		if path.lower().endswith(".npz"):
+			np.savez(path, counts = self.counts, seconds = self.seconds, cell_size = self.cell_size, low = self.low, high = self.high)
+		else:
+			import matplotlib.pyplot as plt
+			plt.imsave(path, self.density(), cmap = "hot", origin = "lower")
+
+	""" Reads a histogram saved with save() """
+	@classmethod
+	def load(cls, path):
+		with np.load(path) as saved:
+			heatmap = cls(float(saved["cell_size"]), float(saved["low"]), float(saved["high"]))
+			heatmap.counts = saved["counts"]
+			heatmap.seconds = float(saved["seconds"])
+		return heatmap
+
+	"""
+	Draws the density on the ground of a 3D axes as filled contours just
+	above z = 0, leaving the empty cells out. Returns the contour set.
+	"""
+	def draw(self, ax, z = 0.05, cmap = "hot", alpha = 0.6, levels = 12):
+		centers = self.low + (np.arange(self.columns) + 0.5) * self.cell_size
+		x, y = np.meshgrid(centers, centers)
+		density = np.ma.masked_equal(self.density(), 0)
+		return ax.contourf(x, y, density, levels = levels, zdir = "z", offset = z, cmap = cmap, alpha = alpha)
@@ -1,29 +1,126 @@
 # Author: Peyton J. Hall
 """
 A main driver module to run the simulation.
-This data science project aims to create a three-dimensional 
+This data science project aims to create a three-dimensional
 simulation of gym traffic for LifeTime Fitness in Savage Minnesota.
-The simulation will dynamically display gym attendance, showing 
+The simulation will dynamically display gym attendance, showing
 virtual people entering and exiting the gym facilities based on hourly traffic data.
+
+Commands: view (the default, also when only options are given) opens the 3D window, run simulates days
+headless and prints or saves their statistics, export renders frames to a
+video or folder, and bench times the simulation. Each command imports only
+what it uses: run never loads pyplot, export draws only in its workers, and
+bench switches to Agg before it imports pyplot.
 """
 
-from LifeTimeSavage import lifetime_savage, hide_axes
-import matplotlib.pyplot as plt
-
-def Validate_Input(prompt):
-	while True:
-		user_input = input(prompt)
-		if user_input == "":
-			return True
-		else:
-			print("Please press Enter to continue.")
-
-def Main():
-	prompt = "Enter the gym.\nPress Enter to select LifeTime Savage: "
-	choice = Validate_Input(prompt)
-    
-	if choice == 1:
-		lifetime_savage()
+import sys
+import json
+import argparse
+from PopularTimes import DAYS # Only needs NumPy
+
+""" CheckinQueue arguments of the desk asked for with --servers, or None for no desk """
+def desk_options(options):
+	return {"servers": options.servers} if options.servers else None
+
+""" Opens LifeTime Savage in 3D, or plays a recorded run back """
+def view(options):
+	from LifeTimeSavage import lifetime_savage
+	lifetime_savage(render_mode = options.render_mode, day = options.day, blit = not options.no_blit, frames = options.frames,
+		profile = options.profile, social_force = options.social_force, flow_fields = options.flow_fields, heatmap = options.heatmap,
+		record = options.record, replay = options.replay, speed = options.speed, time_scale = options.time_scale, coalesce = options.coalesce,
+		interval = options.interval, desk = desk_options(options))
+
+""" Simulates one day, or the whole week in parallel, and prints or saves the statistics """
+def run(options):
+	desk = desk_options(options)
+	if options.day is None:
+		from WeeklyRun import run_week
+		report = run_week(options.seed, options.mode, options.workers, desk)
+	else:
+		import numpy as np
+		from WeeklyRun import run_day
+		stream = np.random.SeedSequence(options.seed).spawn(len(DAYS))[DAYS.index(options.day)] # The day's stream within the week
+		report, dwell, seconds = run_day(options.day, stream.generate_state(2), options.mode, desk)
+	text = json.dumps(report, indent = 2)
+	if options.output is None:
+		print(text)
+	else:
+		with open(options.output, "w") as output:
+			output.write(text)
+
+""" Renders frames offscreen to a video or a folder of PNG frames """
+def export(options):
+	from FrameExport import export_frames
+	print(export_frames(options.path, options.frames, options.workers, seed = options.seed, day = options.day, render_mode = options.render_mode,
+		dpi = options.dpi, fps = options.fps, social_force = options.social_force, flow_fields = options.flow_fields,
+		time_scale = options.time_scale, coalesce = options.coalesce, desk = desk_options(options)))
+
+""" Times the simulation with Benchmark.py, passing the arguments after bench on to it """
+def bench(options):
+	from Benchmark import main
+	main(options.arguments)
+
+""" Options shared by the commands that simulate and draw """
+def add_scene_options(parser):
+	parser.add_argument("--day", type = str.lower, choices = DAYS, help = "follow this day's Popular Times chart")
+	parser.add_argument("--render-mode", choices = ["batched", "individual"], default = "batched")
+	parser.add_argument("--frames", type = int, default = 1000)
+	parser.add_argument("--social-force", action = "store_true", help = "steer people around each other and the walls")
+	parser.add_argument("--flow-fields", action = "store_true", help = "route people along flow fields (needs --social-force)")
+	parser.add_argument("--time-scale", type = float, help = "simulated seconds per frame")
+	parser.add_argument("--coalesce", action = "store_true", help = "merge the ticks of a frame into fewer steps")
+	parser.add_argument("--servers", type = int, help = "model the check-in desk with this many staff")
+
+def build_parser():
+	parser = argparse.ArgumentParser(description = "Simulate gym traffic at LifeTime Savage.")
+	commands = parser.add_subparsers(dest = "command")
+
+	viewing = commands.add_parser("view", help = "open the 3D window (the default)")
+	add_scene_options(viewing)
+	viewing.add_argument("--interval", type = float, default = 100, help = "milliseconds between frames")
+	viewing.add_argument("--no-blit", action = "store_true", help = "redraw the whole scene every frame")
+	viewing.add_argument("--profile", nargs = "?", const = True, help = "time every frame, optionally saving to a .csv or .json path")
+	viewing.add_argument("--heatmap", help = ".npz or image path to save where people spent their time to")
+	viewing.add_argument("--record", help = "path to log every visitor's position to")
+	viewing.add_argument("--replay", help = "play a recorded log back instead of simulating")
+	viewing.add_argument("--speed", type = float, default = 1.0, help = "replay speed in ticks per frame")
+	viewing.set_defaults(handler = view)
+
+	running = commands.add_parser("run", help = "simulate headless and report occupancy and dwell statistics")
+	running.add_argument("--day", type = str.lower, choices = DAYS, help = "one day; the whole week runs in parallel by default")
+	running.add_argument("--mode", choices = ["events", "ticks"], default = "events")
+	running.add_argument("--seed", type = int)
+	running.add_argument("--workers", type = int, help = "processes for the week (one per core by default)")
+	running.add_argument("--servers", type = int, help = "model the check-in desk with this many staff")
+	running.add_argument("--output", help = "JSON file to save the report to instead of printing it")
+	running.set_defaults(handler = run)
+
+	exporting = commands.add_parser("export", help = "render frames to an .mp4 or a folder of PNG frames")
+	exporting.add_argument("path")
+	add_scene_options(exporting)
+	exporting.add_argument("--workers", type = int)
+	exporting.add_argument("--seed", type = int)
+	exporting.add_argument("--dpi", type = int, default = 100)
+	exporting.add_argument("--fps", type = float, default = 10)
+	exporting.set_defaults(handler = export)
+
+	benchmarking = commands.add_parser("bench", help = "time the simulation; takes the options of Benchmark.py", add_help = False)
+	benchmarking.set_defaults(handler = bench)
+	return parser
+
+def Main(arguments = None):
+	arguments = sys.argv[1:] if arguments is None else arguments
+	parser = build_parser()
+	if not arguments or (arguments[0].startswith("-") and arguments[0] not in ("-h", "--help")):
+		arguments = ["view"] + list(arguments) # With no command, open the window as before, e.g. Main.py --day monday
+	options, unknown = parser.parse_known_args(arguments)
+	if options.command == "bench":
+		options.arguments = unknown # Benchmark.py parses its own options
+	elif unknown:
+		parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+	if getattr(options, "flow_fields", False) and not options.social_force:
+		parser.error("--flow-fields steers the social-force model; pass --social-force as well")
+	options.handler(options)
 
 # Call the Main function
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+# Author: Peyton J. Hall
+"""
+A module to read the Google Popular Times charts in the Popular Times folder.
+The bars of each chart are measured once and cached as a small .npz file,
+keyed by a hash of the images, so later runs only load a 7 x 24 table.
+"""
+
+import os
+import hashlib
+import numpy as np
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Popular Times")
+CACHE = os.path.join(FOLDER, "popular_times.npz")
+
+""" Hash of the chart images, used to tell whether the cache is still valid """
+def charts_key(folder = FOLDER):
+	digest = hashlib.sha256()
+	for day in DAYS:
+		with open(os.path.join(folder, f"{day}.png"), "rb") as chart:
+			digest.update(chart.read())
+	return digest.hexdigest()
+
+""" Groups sorted indices into runs of consecutive values, returned as (first, last) pairs """
+def runs(indices):
+	if len(indices) == 0:
+		return []
+	breaks = np.flatnonzero(np.diff(indices) > 1)
+	starts = np.concatenate([[indices[0]], indices[breaks + 1]])
+	ends = np.concatenate([indices[breaks], [indices[-1]]])
+	return list(zip(starts, ends))
+
+"""
+Measures the bars of one Popular Times chart. Returns 24 values, one per
+hour of the day, as a fraction of the chart's top gridline (0 when the
+gym has no bar for that hour).
+"""
+def digitize_chart(path):
+	from PIL import Image # Only needed when the cache has to be rebuilt
+	pixels = np.asarray(Image.open(path).convert("RGB"), dtype = float)
+	brightness = pixels.mean(axis = 2)
+	height, width = brightness.shape
+
+	# The baseline and the gridlines are the rows lit across most of the chart
+	line_rows = np.flatnonzero((brightness > 80).sum(axis = 1) > 0.7 * width)
+	lines = runs(line_rows)
+	top_gridline = lines[0][0]
+	baseline, baseline_end = lines[-1]
+
+	# Tick marks hang below the baseline every 3 hours, starting at 6 AM
+	tick_row = brightness[baseline_end + 3]
+	ticks = [(first + last) / 2 for first, last in runs(np.flatnonzero(tick_row > 80))]
+	pixels_per_hour = (ticks[1] - ticks[0]) / 3
+
+	# Bars are the wide lit columns between the top gridline and the baseline.
+	# Bars that differ from the usual traffic are drawn in the gridline color,
+	# so the gridline rows themselves are left out.
+	chart = brightness[top_gridline:baseline] > 80
+	chart[line_rows[line_rows < baseline] - top_gridline] = False
+	busyness = np.zeros(24)
+	for first, last in runs(np.flatnonzero(chart.any(axis = 0))):
+		if last - first < 5: # Skip the thin dotted marker above the highlighted bar
+			continue
+		center = (first + last) // 2
+		top = top_gridline + np.flatnonzero(chart[:, center])[0]
+		hour = int(round(6 + (center - ticks[0]) / pixels_per_hour))
+		busyness[hour] = (baseline - top) / (baseline - top_gridline)
+	return busyness
+
+"""
+Returns the hourly relative busyness of every day as a (7, 24) array with
+rows in DAYS order, scaled so the busiest hour of the week is 100.
+The charts are only measured when the cache is missing or out of date.
+"""
+def load_popular_times(folder = FOLDER, cache = CACHE):
+	key = charts_key(folder)
+	if cache is not None and os.path.exists(cache):
+		with np.load(cache) as cached:
+			if str(cached["key"]) == key:
+				return cached["busyness"]
+	busyness = np.array([digitize_chart(os.path.join(folder, f"{day}.png")) for day in DAYS])
+	busyness = 100 * busyness / busyness.max()
+	if cache is not None: # Moved into place whole, so parallel days never load a half-written cache
+		partial = f"{cache}.{os.getpid()}.npz"
+		np.savez(partial, key = key, busyness = busyness)
+		os.replace(partial, cache)
+	return busyness
@@ -0,0 +1,97 @@
+# Author: Peyton J. Hall
+"""
+A module to play back a recorded run in the 3D scene of LifeTime Savage.
+Each frame reads one tick of a TrajectoryLog and draws it; nothing is
+simulated, so playback keeps the same frame rate however heavy the
+recorded run was. Playback can be paused, sped up and slowed down, and
+moved to any tick with the keyboard or the scrub bar under the scene.
+"""
+
+import numpy as np
+from matplotlib.backend_bases import MouseButton
+from matplotlib.patches import Rectangle
+from CrowdRenderer import CrowdLayer
+
+SEEK_SECONDS = 60 # Simulated seconds skipped by one press of "," or "."
+
+"""
+Plays log (a TrajectoryLog) on ax, speed ticks per frame. Keys: space
+pauses and resumes, up and down double and halve the speed, and "," and
+"." seek back and forward a minute. Clicking or dragging on the bar under
+the scene seeks to that point of the run. update() is the FuncAnimation
+callback, as for CrowdRenderer. With blit, only the people, the legend and
+the bar are redrawn each frame.
+"""
+class ReplayPlayer:
+	def __init__(self, ax, log, speed = 1.0, blit = False):
+		self.ax = ax
+		self.log = log
+		self.speed = speed
+		self.blit = blit
+		self.first, self.last = log.tick_range()
+		self.tick = float(self.first) # Tick shown, kept fractional so slow speeds still move
+		self.playing = True
+		self.crowd = CrowdLayer(ax) # Every person, as in CrowdRenderer's batched mode
+		self.text_handle = ax.text2D(0.05, 0.95, "", transform = ax.transAxes, fontsize = 12)
+
+		# Scrub bar: the part of the run played so far, filled in
+		figure = ax.get_figure()
+		self.bar_ax = figure.add_axes([0.15, 0.03, 0.7, 0.025])
+		self.bar_ax.set_xlim(self.first, max(self.last, self.first + 1))
+		self.bar_ax.set_ylim(0, 1)
+		self.bar_ax.set_xticks([])
+		self.bar_ax.set_yticks([])
+		self.bar = self.bar_ax.add_patch(Rectangle((self.first, 0), 0, 1, color = "tab:blue"))
+		figure.canvas.mpl_connect("key_press_event", self.on_key)
+		figure.canvas.mpl_connect("button_press_event", self.on_mouse)
+		figure.canvas.mpl_connect("motion_notify_event", self.on_mouse)
+
+	""" Moves playback to tick, kept within the run """
+	def seek(self, tick):
+		self.tick = float(np.clip(tick, self.first, self.last))
+
+	def on_key(self, event):
+		if event.key == " ":
+			self.playing = not self.playing
+		elif event.key == "up":
+			self.speed *= 2
+		elif event.key == "down":
+			self.speed /= 2
+		elif event.key in (",", "."):
+			self.seek(self.tick + (1 if event.key == "." else -1) * SEEK_SECONDS / self.log.tick_seconds)
+
+	""" Seeks to wherever the bar is clicked or dragged """
+	def on_mouse(self, event):
+		# Clicks carry the button pressed; motion carries the buttons held down
+		held = event.button == MouseButton.LEFT if event.name == "button_press_event" else MouseButton.LEFT in event.buttons
+		if event.inaxes is self.bar_ax and held and event.xdata is not None:
+			self.seek(event.xdata)
+
+	""" Legend function to display the person count and where playback is """
+	def legend(self, count):
+		seconds = int(self.log.clock(int(self.tick)))
+		text = f"Person count: {count}\nReplay {seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}, {self.speed:g}x"
+		if not self.playing:
+			text += ", paused"
+		return text
+
+	""" The artists that change every frame; FuncAnimation redraws only these when blitting """
+	def animated_artists(self):
+		return self.crowd.artists() + [self.text_handle, self.bar]
+
+	"""
+	Update function for the animation: draws the current tick and moves
+	playback on by speed ticks, stopping at the end of the run.
+	"""
+	def update(self, frame):
+		records = self.log.tick(int(self.tick))
+		self.crowd.draw(records["position"].astype(float), records["color"] / 255)
+		self.text_handle.set_text(self.legend(len(records)))
+		self.bar.set_width(self.tick - self.first)
+		if self.playing:
+			self.seek(self.tick + self.speed)
+		animated = self.animated_artists()
+		if self.blit and self.ax.M is not None:
+			for artist in self.crowd.artists(): # Blitted artists skip the full figure draw, so project them here
+				artist.do_3d_projection()
+		return animated
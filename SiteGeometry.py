@@ -0,0 +1,369 @@
+# Author: Peyton J. Hall
+"""
+A module describing the site around LifeTime in Savage, Minnesota as data.
+The parking lot outline is a table of curve segments with their domains,
+sampled in one vectorized pass: straight lines need 2 points and curves get
+as many points as their bending requires. The filled areas of the site and
+the walls people cannot walk through are tables as well.
+"""
+
+import numpy as np
+
+KINDS = ["line", "quadratic", "cubic", "sqrt", "exponential"]
+
+"""
+Each row is (kind, axis, a, b, h, k, low, high, alpha). The axis is the
+independent variable u, which runs from low to high; the curve gives the
+other coordinate as:
+	line:        a(u - h) + k
+	quadratic:   a(u - h)^2 + k
+	cubic:       a(u - h)^3 + k
+	sqrt:        a * SQRT[b(u - h)] + k
+	exponential: a * b^(u - h) + k
+"""
+PARKING_LOT_OUTLINE = [
+	("line", "x", 0, 1, 0, -8, -122, 57.5, 1), # Equation 1: y = -8 {-122 <= x <= 57.5}
+	("line", "x", 0, 1, 0, -100, -23, -7, 0.5), # Equation 2: y = -100 {-23 <= x <= -7}
+	("line", "y", 0, 1, 0, -7, -100, -86, 1), # Equation 3: x = -7 {-100 <= y <= -86}
+	("line", "y", 0, 1, 0, -23, -100, -86, 1), # Equation 4: x = -23 {-100 <= y <= -86}
+	("line", "y", 0, 1, 0, 57.5, -8, 55, 1), # Equation 5: x = 57.5 {-8 <= y <= 55}
+	("line", "x", 5, 1, -120.4, 0, (-50 - 602) / 5, (-7.99 - 602) / 5, 1), # Equation 6: y = 5(x + 120.4) {-50 <= y <= -7.99}
+	("cubic", "x", 0.2, 1, -1.35, -50, -6.664, 3.964, 1), # Equation 7: y = 0.2[(x + 1.35)^3] - 50 {-6.664 <= x <= 3.964}
+	("cubic", "x", 0.2, 1, -17.35, -50, -22.67, -12.036, 1), # Equation 8: y = 0.2[(x + 17.35)^3] - 50 {-22.67 <= x <= -12.036}
+	("cubic", "x", 0.2, 1, -6.68, -50, -11.994, -1.3667, 1), # Equation 9: y = 0.2[(x + 6.68)^3] - 50 {-11.994 <= x <= -1.3667}
+	("cubic", "x", 0.2, 1, -12.01, -50, -17.324, -6.696, 1), # Equation 10: y = 0.2[(x + 12.01)^3] - 50 {-17.324 <= x <= -6.696}
+	("line", "x", 0, 1, 0, -80, -17.33, -11.99, 1), # Equation 11: y = -80 {-17.33 <= x <= -11.99}
+	("line", "x", 0, 1, 0, -20, -6.7, -1.36, 1), # Equation 12: y = -20 {-6.7 <= x <= -1.36}
+	("line", "x", 0, 1, 0, -20, -39, -12.02, 1), # Equation 13: y = -20 {-39 <= x <= -12.02}
+	("exponential", "x", -1, 2, -31.9, -30, -38.99267, -27.339, 1), # Equation 14: y = [-2^(x + 31.9)] - 30 {-38.99267 <= x <= -27.339}
+	("quadratic", "y", 0.1, 1, -25, -41.5, -30.01, -20, 1), # Equation 15: x = .1[(y + 25)^2] - 41.5 {-30.01 <= y <= -20}
+	("line", "x", 15, 1, -27.3, -53, -29.1, -27.339, 1), # Equation 16: y = 15(x + 27.3) - 53 {-29.1 <= x <= -27.339}
+	("line", "x", 0, 1, 0, -80, -29.1, -22.6, 1), # Equation 17: y = -80 {-29.1 <= x <= -22.6}
+	("line", "x", 0, 1, 0, -20, 3.96, 25, 1), # Equation 18: y = -20 {3.96 <= x <= 25}
+	("sqrt", "x", -1, 7, -130.4, -70, -130.4, -93.82857, 1), # Equation 19: y = -SQRT[7(x + 130.4)] - 70 {x <= -93.8}
+	("line", "y", 0, 1, 0, -130.4, -70, -50, 1), # Equation 20: x = -130.4 {-70 <= y <= -50}
+	("line", "x", 0, 1, 0, -86, -93.83, -23, 1), # Equation 21: y = -86 {-93.83 <= x <= -23}
+	("line", "x", 0, 1, 0, -86, -7, 57.5, 1), # Equation 22: y = -86 {-7 <= x <= 57.5}
+	("line", "x", 0.2, 1, 57.5, -86, 57.5, 111, 1), # Equation 23: y = .2(x - 57.5) - 86 {57.5 <= x <= 111}
+	("line", "x", 0, 1, 0, -80, -6.68, 21.32, 1), # Equation 24: y = -80 {-6.68 <= x <= 21.32}
+	("line", "x", -5, 1, 21.3, -80, 13.37, 21.3, 1), # Equation 25: y = -5(x - 21.3) - 80 {13.37 <= x <= 21.3}
+	("quadratic", "y", -0.05, 1, -24.5, 26, -40.39, -20, 1), # Equation 26: x = -.05(y + 24.5)^2 + 26 {-40.39 <= y <= -20}
+	("line", "y", -1 / 6, 1, -75.3, 111, -75.3, 25, 1), # Equation 27: y = -6(x-111) - 75.3 {-75.3 <= y <= 25}
+	("line", "x", 0.2, 1, 94.3, 24.9, 88, 94.3, 1), # Equation 28: y = .2(x - 94.3) + 24.9 {88 <= x <= 94.3}
+	("line", "x", -1.5, 1, 88, 23.64, 80, 88, 1), # Equation 29: y = -1.5(x - 88) + 23.64 {80 <= x <= 88}
+	("line", "x", -1.5, 1, 88, 23.64, 49.42, 75, 1), # Equation 30: y = -1.5(x - 88) + 23.64 {49.42 <= x <= 75}
+	("line", "x", 0, 1, 0, 56.5, -51, -43.5, 1), # Equation 31: y = 56.5 {-51 <= x <= -43.5}
+	("line", "x", -1.5, 1, 57.5, 55, 44.83, 57.5, 1), # Equation 32: y = -1.5(x - 57.5) + 55 {44.83 <= x <= 57.5}
+	("line", "y", 0, 1, 0, -51, 56.5, 74, 1), # Equation 33: x = -51 {56.5 <= y <= 74}
+	("line", "y", 0, 1, 0, -43.5, 56.5, 68.5, 1), # Equation 34: x = -43.5 {56.5 <= y <= 68.5}
+	("line", "x", 0, 1, 0, 74, -38, 44.9, 1), # Equation 35: y = 74 {-38 <= x <= 44.9}
+	("line", "x", 0, 1, 0, 81.5, -43.5, 49.42667, 1), # Equation 36: y = 81.5 {-43.5 <= x <= 49.42667}
+	("line", "x", 1, 1, -40, 72, -43.5, -38, 1), # Equation 37: y = 1(x + 40) + 72 {-43.5 <= x <= -38}
+	("line", "x", 1, 1, -45, 80, -51, -43.5, 1), # Equation 38: y = 1(x + 45) + 80 {-51 <= x <= -43.5}
+	("line", "x", -1.5, 1, 85, 45, 82.33, 87.34, 0.5), # Equation 39: y = -1.5(x - 85) + 45 {82.33 <= x <= 87.34}
+	("line", "x", 0.8, 1, 75, 43.14, 75, 82.34, 1), # Equation 40: y = .8(x - 75) + 43.14 {75 <= x <= 82.34}
+	("line", "x", 0.8, 1, 80, 35.64, 80, 87.34, 1), # Equation 41: y = .8(x - 80) + 35.64 {80 <= x <= 87.34}
+	("line", "x", 0, 1, 0, -98, -17.33, -11.99, 1), # Equation 42: y = -98 {-17.33 <= x <= -11.99}
+	("line", "x", 0, 1, 0, -86, -17.33, -11.99, 1), # Equation 43: y = -86 {-17.33 <= x <= -11.99}
+	("line", "y", 0, 1, 0, -17.33, -98, -86, 1), # Equation 44: x = -17.33 {-98 <= y <= -86}
+	("line", "y", 0, 1, 0, -12, -98, -86, 1), # Equation 45: x = -12 {-98 <= y <= -86}
+	("line", "x", -1.5, 1, 85, 45, 25, 82.22043, 1), # Equation 46: y = -1.5(x - 85) + 45 {25 <= x <= 82.22043}
+	("line", "x", -1.5, 1, 97, 45, 37, 90, 1), # Equation 47: y = -1.5(x - 97) + 45 {37 <= x <= 90}
+	("quadratic", "x", 0.01, 1, 134, 36.15, 89.983866, 135, 1), # Equation 48: y = .01(x - 134)^2 + 36.15 {89.983866 <= x <= 135}
+	("line", "x", -1.5, 1, 85, 45, 87.33043, 90.00333, 1), # Equation 49: y = -1.5(x - 85) + 45 {87.33043 <= x <= 90.00333}
+	("sqrt", "x", -1, 6, 87.33, 41.5, 90.00332, 135, 1), # Equation 50: y = -SQRT[6(x - 87.33)] + 41.5 {90.00332 <= x <= 135}
+	("line", "x", 0, 1, 0, -100, -135, -23, 1), # Equation 51: y = -100 {-135 <= x <= -23}
+	("line", "x", 0, 1, 0, -100, -7, 135, 1), # Equation 52: y = -100 {-7 <= x <= 135}
+	("line", "x", 0, 1, 0, -111, -135, 135, 1), # Equation 53: y = -111 {-135 <= x <= 135}
+]
+
+"""
+Filled areas of the site as (name, color, walk cost, vertices). The walk
+cost is how much people avoid crossing the area: 1 on the lot's concrete,
+more on the streets and on the landscaped curbs, which sit 0.2 m up.
+"""
+SITE_AREAS = [
+	("Parking lot concrete", "gray", 1, np.array([
+		[57.5, -8, 0], [57.5, 55, 0], [44.83, 74, 0],
+		[-38, 74, 0], [-43.5, 68.5, 0], [-43.5, 56.5, 0],
+		[-51, 56.5, 0], [-51, 74, 0], [-43.5, 81.5, 0],
+		[49.43, 81.5, 0], [75, 43.14, 0], [82.33, 49.00, 0],
+		[87.33, 41.50, 0], [80, 35.64, 0], [88, 23.64, 0],
+		[94.3, 24.9, 0], [111, -75.3, 0], [57.5, -86, 0],
+		[-7, -86, 0], [-7, -100, 0], [-23, -100, 0], [-23, -86, 0],
+		[-93.83, -86, 0], [-130.4, -70, 0], [-130.4, -50, 0], [-122, -8, 0]
+	])),
+	("Parking lot concrete, south-west corner", "gray", 1, np.array([
+		[-93.82857, -86, 0], [-100, -84.58767, 0],
+		[-104, -83.59412, 0], [-107, -82.79844, 0], [-110, -81.9499, 0],
+		[-112, -81.34901, 0], [-114, -80.71448, 0], [-116, -80.03992, 0],
+		[-118, -79.31665, 0], [-120, -78.53229, 0], [-122, -77.66812, 0],
+		[-124, -76.69328, 0], [-126, -75.54977, 0], [-128, -74.09878, 0],
+		[-129, -73.1305, 0], [-130, -71.67332, 0],
+		[-130.4, -70, 0]
+	])),
+	("Landscape curb, south-east", "green", 3, np.array([
+		[-12, -86, .2], [-12,-98, .2],
+		[-17.33, -98, .2], [-17.33, -86, .2]
+	])),
+	("Landscape curb, east", "green", 3, np.array([
+		[3.96329, -20, .2], [24.9875, -20, .2], [25.3875, -21, .2],
+		[25.6875, -22, .2], [25.8875, -23, .2], [25.9875, -24, .2],
+		[25.9875, -25, .2], [25.8875, -26, .2], [25.8875, -27, .2],
+		[25.3875, -28, .2], [24.9875, -29, .2], [24.4875, -30, .2],
+		[23.8875, -31, .2], [23.1875, -32, .2], [22.3875, -33, .2],
+		[21.4875, -34, .2], [20.4875, -35, .2], [19.3875, -36, .2],
+		[18.1875, -37, .2], [16.8875, -38, .2], [15.4875, -39, .2],
+		[13.9875, -40, .2], [13.37771, -40.38854, .2], [21.3, -80, .2],
+		[-6.66329, -80, .2], [-6.60359, -79, .2], [-6.54249, -78, .2],
+		[-6.47993, -77, .2], [-6.4158, -76, .2], [-6.35, -75, .2],
+		[-6.28242, -74, .2], [-6.21294, -73, .2], [-6.14142, -72, .2],
+		[-6.06769, -71, .2], [-5.99159, -70, .2], [-5.9129, -69, .2],
+		[-5.8314, -68, .2], [-5.74683, -67, .2], [-5.65887, -66, .2],
+		[-5.56716, -65, .2], [-5.47129, -64, .2], [-5.37073, -63, .2],
+		[-5.26487, -62, .2], [-5.15295, -61, .2], [-5.03403, -60, .2],
+		[-4.90689, -59, .2], [-4.76995, -58, .2], [-4.62107, -57, .2],
+		[-4.45723, -56, .2], [-4.27402, -55, .2], [-4.06442, -54, .2],
+		[-3.81621, -53, .2], [-3.50443, -52, .2], [-3.30743, -51.5, .2],
+		[-3.05998, -51, .2], [-2.70721, -50.5, .2], [-2.42722, -50.25, .2],
+		[-2.20499, -50.125, .2], [-1.35, -50, .2], [-0.49501, -49.875, .2],
+		[-0.27278, -49.75, .2], [0, -49.5, .2], [0.35998, -49, .2],
+		[0.60743, -48.5, .2], [0.80443, -48, .2], [1.11621, -47, .2],
+		[1.36442, -46, .2], [1.57402, -45, .2], [1.75723, -44, .2],
+		[1.92107, -43, .2], [2.06995, -42, .2], [2.20689, -41, .2],
+		[2.33403, -40, .2], [2.45295, -39, .2], [2.56487, -38, .2],
+		[2.67073, -37, .2], [2.77129, -36, .2], [2.86716, -35, .2],
+		[2.95887, -34, .2], [3.04683, -33, .2], [3.1314, -32, .2],
+		[3.2129, -31, .2], [3.29159, -30, .2], [3.36769, -29, .2],
+		[3.44142, -28, .2], [3.51294, -27, .2], [3.58242, -26, .2],
+		[3.65, -25, .2], [3.7158, -24, .2], [3.77993, -23, .2],
+		[3.84249, -22, .2], [3.90359, -21, .2]
+	])),
+	("Landscape curb, center", "green", 3, np.array([
+		[-6.69671, -20, .2], [-1.36671, -20, .2], [-1.42641, -21, .2],
+		[-1.48751, -22, .2], [-1.55007, -23, .2], [-1.6142, -24, .2],
+		[-1.68, -25, .2], [-1.74758, -26, .2], [-1.81706, -27, .2],
+		[-1.88858, -28, .2], [-1.96231, -29, .2], [-2.03841, -30, .2],
+		[-2.1171, -31, .2], [-2.1986, -32, .2], [-2.28317, -33, .2],
+		[-2.37113, -34, .2], [-2.46284, -35, .2], [-2.55871, -36, .2],
+		[-2.65927, -37, .2], [-2.76513, -38, .2], [-2.87705, -39, .2],
+		[-2.99597, -40, .2], [-3.12311, -41, .2], [-3.26005, -42, .2],
+		[-3.40893, -43, .2], [-3.57277, -44, .2], [-3.75598, -45, .2],
+		[-3.96558, -46, .2], [-4.21379, -47, .2], [-4.52557, -48, .2],
+		[-4.72257, -48.5, .2], [-4.97002, -49, .2], [-5.33, -49.5, .2],
+		[-5.60278, -49.75, .2], [-5.82501, -49.875, .2], [-6.68, -50, .2],
+		[-7.53499, -50.125, .2], [-7.75722, -50.25, .2], [-8.03721, -50.5, .2],
+		[-8.38998, -51, .2], [-8.63743, -51.5, .2], [-8.83443, -52, .2],
+		[-9.14621, -53, .2], [-9.39442, -54, .2], [-9.60402, -55, .2],
+		[-9.78723, -56, .2], [-9.95107, -57, .2], [-10.09995, -58, .2],
+		[-10.23689, -59, .2], [-10.36403, -60, .2], [-10.48295, -61, .2],
+		[-10.59487, -62, .2], [-10.70073, -63, .2], [-10.80129, -64, .2],
+		[-10.89716, -65, .2], [-10.98887, -66, .2], [-11.07683, -67, .2],
+		[-11.1614, -68, .2], [-11.2429, -69, .2], [-11.32159, -70, .2],
+		[-11.39769, -71, .2], [-11.47142, -72, .2], [-11.54294, -73, .2],
+		[-11.61242, -74, .2], [-11.68, -75, .2], [-11.7458, -76, .2],
+		[-11.80993, -77, .2], [-11.87249, -78, .2], [-11.93359, -79, .2],
+		[-11.99329, -80, .2], [-11.99329, -80, .2], [-17.26359, -79, .2],
+		[-17.20249, -78, .2], [-17.13993, -77, .2], [-17.0758, -76, .2],
+		[-17.01, -75, .2], [-16.94242, -74, .2], [-16.87294, -73, .2],
+		[-16.80142, -72, .2], [-16.72769, -71, .2], [-16.65159, -70, .2],
+		[-16.5729, -69, .2], [-16.4914, -68, .2], [-16.40683, -67, .2],
+		[-16.31887, -66, .2], [-16.22716, -65, .2], [-16.13129, -64, .2],
+		[-16.03073, -63, .2], [-15.92487, -62, .2], [-15.81295, -61, .2],
+		[-15.69403, -60, .2], [-15.56689, -59, .2], [-15.42995, -58, .2],
+		[-15.28107, -57, .2], [-15.11723, -56, .2], [-14.93402, -55, .2],
+		[-14.72442, -54, .2], [-14.47621, -53, .2], [-14.16443, -52, .2],
+		[-13.96743, -51.5, .2], [-13.71998, -51, .2], [-13.36721, -50.5, .2],
+		[-13.08722, -50.25, .2], [-12.86499, -50.125, .2], [-12.01, -50, .2],
+		[-11.15501, -49.875, .2], [-10.93278, -49.75, .2], [-10.66, -49.5, .2],
+		[-10.30002, -49, .2], [-10.05257, -48.5, .2], [-9.85557, -48, .2],
+		[-9.54379, -47, .2], [-9.29558, -46, .2], [-9.08598, -45, .2],
+		[-8.90277, -44, .2], [-8.73893, -43, .2], [-8.59005, -42, .2],
+		[-8.45311, -41, .2], [-8.32597, -40, .2], [-8.20705, -39, .2],
+		[-8.09513, -38, .2], [-7.98927, -37, .2], [-7.88871, -36, .2],
+		[-7.79284, -35, .2], [-7.70113, -34, .2], [-7.61317, -33, .2],
+		[-7.5286, -32, .2], [-7.4471, -31, .2], [-7.36841, -30, .2],
+		[-7.29231, -29, .2], [-7.21858, -28, .2], [-7.14706, -27, .2],
+		[-7.07758, -26, .2], [-7.01, -25, .2], [-6.9442, -24, .2],
+		[-6.88007, -23, .2], [-6.81751, -22, .2], [-6.75641, -21, .2]
+	])),
+	("Landscape curb, west", "green", 3, np.array([
+		[-39, -20, .2], [-12.03671, -20, .2], [-12.09641, -21, .2],
+		[-12.15751, -22, .2], [-12.22007, -23, .2], [-12.2842, -24, .2],
+		[-12.35, -25, .2], [-12.41758, -26, .2], [-12.48706, -27, .2],
+		[-12.55858, -28, .2], [-12.63231, -29, .2], [-12.70841, -30, .2],
+		[-12.7871, -31, .2], [-12.8686, -32, .2], [-12.95317, -33, .2],
+		[-13.04113, -34, .2], [-13.13284, -35, .2], [-13.22871, -36, .2],
+		[-13.32927, -37, .2], [-13.43513, -38, .2], [-13.54705, -39, .2],
+		[-13.66597, -40, .2], [-13.79311, -41, .2], [-13.93005, -42, .2],
+		[-14.07893, -43, .2], [-14.24277, -44, .2], [-14.42598, -45, .2],
+		[-14.63558, -46, .2], [-14.88379, -47, .2], [-15.19557, -48, .2],
+		[-15.39257, -48.5, .2], [-15.64002, -49, .2], [-15.99279, -49.5, .2],
+		[-16.27278, -49.75, .2], [-16.49501, -49.875, .2], [-17.35, -50, .2],
+		[-18.20499, -50.125, .2], [-18.42722, -50.25, .2], [-18.70721, -50.5, .2],
+		[-19.05998, -51, .2], [-19.30743, -51.5, .2], [-19.50443, -52, .2],
+		[-19.81621, -53, .2], [-20.06442, -54, .2], [-20.27402, -55, .2],
+		[-20.45723, -56, .2], [-20.62107, -57, .2], [-20.76995, -58, .2],
+		[-20.90689, -59, .2], [-21.03403, -60, .2], [-21.15295, -61, .2],
+		[-21.26487, -62, .2], [-21.37073, -63, .2], [-21.47129, -64, .2],
+		[-21.56716, -65, .2], [-21.65887, -66, .2], [-21.74683, -67, .2],
+		[-21.8314, -68, .2], [-21.9129, -69, .2], [-21.99159, -70, .2],
+		[-22.06769, -71, .2], [-22.14142, -72, .2], [-22.21294, -73, .2],
+		[-22.28242, -74, .2], [-22.35, -75, .2], [-22.4158, -76, .2],
+		[-22.47993, -77, .2], [-22.54249, -78, .2], [-22.60359, -79, .2],
+		[-22.66329, -80, .2], [-29.1, -80, .2], [-27.33963, -53.59441, .2],
+		[-27.44057, -52, .2], [-27.50768, -51, .2], [-27.57807, -50, .2],
+		[-27.65207, -49, .2], [-27.73007, -48, .2], [-27.81254, -47, .2],
+		[-27.9, -46, .2], [-27.99311, -45, .2], [-28.09265, -44, .2],
+		[-28.19956, -43, .2], [-28.31504, -42, .2], [-28.44057, -41, .2],
+		[-28.57807, -40, .2], [-28.73007, -39, .2], [-28.9, -38, .2],
+		[-29.09265, -37, .2], [-29.31504, -36, .2], [-29.57807, -35, .2],
+		[-29.73007, -34.5, .2], [-29.9, -34, .2], [-30.09265, -33.5, .2],
+		[-30.31504, -33, .2], [-30.57807, -32.5, .2], [-30.9, -32, .2],
+		[-31.31504, -31.5, .2], [-31.57807, -31.25, .2], [-31.9, -31, .2],
+		[-32.31504, -30.75, .2], [-32.9, -30.5, .2], [-33.9, -30.25, .2],
+		[-38.99267, -30.00733, .2], [-39, -30, .2], [-39.9, -29, .2],
+		[-40.6, -28, .2], [-41.1, -27, .2], [-41.4, -26, .2],
+		[-41.5, -25, .2], [-41.4, -24, .2], [-41.1, -23, .2],
+		[-40.6, -22, .2], [-39.9, -21, .2]
+	])),
+	("Loftus Ln", "gray", 2, np.array([
+		[-135, -100, 0], [135, -100, 0],
+		[135, -111, 0], [-135, -111, 0]
+	])),
+	("W 140th St", "gray", 2, np.array([
+		[25, 135, 0], [37, 135, 0],
+		[89.98387, 55.5242, 0], [82.33043, 49.00435, 0]
+	])),
+	("W 140th St, bend", "gray", 2, np.array([
+		[89.98387, 55.5242, 0], [91, 54.64, 0], [92, 53.79, 0],
+		[95, 51.36, 0], [100, 47.71, 0], [105, 44.56, 0],
+		[110, 41.91, 0], [115, 39.76, 0], [120, 38.11, 0],
+		[125, 36.96, 0], [130, 36.31, 0], [135, 36.16, 0],
+		[135, 24.58787, 0], [130, 24.58787, 0], [125, 26.46604, 0],
+		[120, 27.49929, 0], [115, 28.61513, 0], [110, 29.83724, 0],
+		[105, 31.2034, 0], [100, 32.78106, 0], [95, 34.7162, 0],
+		[92, 36.20661, 0], [91, 36.80745, 0], [90.00333, 37.495, 0],
+		[82.33043, 49.00435, 0]
+	]))
+]
+
+""" Floors people walk on that are not drawn as areas: the sidewalk, the atrium and the gym """
+FLOORS = [
+	np.array([[-122, -8], [57.5, -8], [57.5, 0], [-122, 0]]), # Sidewalk between the lot and the building
+	np.array([[-7, 0], [7, 0], [0, -8]]), # Atrium
+	np.array([[-64, 0], [36, 0], [36, 56.5], [-64, 56.5]]) # Gym floor
+]
+
+# Zones of the site a person can be in, as used for occupancy statistics
+ZONES = ["lot", "atrium", "gym"]
+
+"""
+Walls at floor level as ((x1, y1), (x2, y2)) segments. The front of the
+building is open where the atrium meets it, and each slanted atrium wall
+has a 2 m door around its midpoint (position 2 of a route, at x = ±3.5, y = -4).
+"""
+WALLS = np.array([
+	[(-64, 0), (-7, 0)], # Front of the building, left of the atrium
+	[(7, 0), (36, 0)], # Front of the building, right of the atrium
+	[(-64, 0), (-64, 56.5)], # Left side
+	[(36, 0), (36, 56.5)], # Right side
+	[(-64, 56.5), (36, 56.5)], # Back
+	[(-7, 0), (-4.1585, -3.2474)], # Left atrium wall, up to its door
+	[(-2.8415, -4.7526), (0, -8)], # Left atrium wall, after its door
+	[(7, 0), (4.1585, -3.2474)], # Right atrium wall, up to its door
+	[(2.8415, -4.7526), (0, -8)], # Right atrium wall, after its door
+	[(1, 0.8), (3, 0.8)] # Check-in desk counter, beside position 3 at (0, 0)
+])
+
+"""
+Where a line of count people waiting at the check-in desk stands, front
+first, as (count, 2) points spacing apart. The line fills rows across the
+atrium from the desk back towards its tip, each row kept margin inside the
+slanted walls and walked in alternate directions, so neighbours in line
+stand side by side. Whoever does not fit waits outside the left door, in
+columns along the outside of the atrium wall, from its tip going left over the
+sidewalk.
+"""
+def queue_spots(count, spacing = 0.6, margin = 0.5):
+	slant = 8 / np.hypot(7, 8) # Distance from a slanted atrium wall per metre of x
+	rows = np.arange(-1, -8, -spacing) # From just behind the staff towards the tip
+	reach = 7 + 7 * rows / 8 - margin / slant # Furthest x from the middle each row can use
+	spots = []
+	for row, (y, limit) in enumerate(zip(rows, reach)):
+		if limit < 0:
+			break
+		x = np.arange(-limit, limit + 1e-9, spacing)
+		x += (limit - x[-1]) / 2 # Centered in the row
+		spots.append(np.column_stack([x if row % 2 == 0 else x[::-1], np.full(len(x), y)]))
+	inside = np.concatenate(spots)[:count]
+
+	# The rest: columns across the sidewalk, the first against the left atrium wall
+	rest = np.arange(count - len(inside))
+	y = np.arange(-0.5, -7.5, -spacing) # Clear of the front of the building and the lot
+	column, row = rest // len(y), rest % len(y)
+	row = np.where(column % 2 == 0, len(y) - 1 - row, row) # Up from the atrium tip, then back down
+	x = -7 - 7 * y[row] / 8 - margin / slant - spacing * column
+	return np.concatenate([inside, np.column_stack([x, y[row]])])
+
+""" Evaluates curves of any kind at once; every argument is an array of the same shape """
+def evaluate(kind, a, b, h, k, u):
+	d = u - h
+	value = np.empty_like(d)
+	formulas = [
+		lambda m: a[m] * d[m],
+		lambda m: a[m] * d[m]**2,
+		lambda m: a[m] * d[m]**3,
+		lambda m: a[m] * np.sqrt(np.maximum(b[m] * d[m], 0)),
+		lambda m: a[m] * b[m]**d[m]
+	]
+	for index, formula in enumerate(formulas):
+		mask = kind == index
+		value[mask] = formula(mask)
+	return value + k
+
+""" Turns (u, value) pairs into x and y according to each curve's axis """
+def to_xy(on_x, u, value):
+	return np.where(on_x, u, value), np.where(on_x, value, u)
+
+"""
+Samples every curve of a table in one vectorized pass. Straight lines get
+2 points; a curve gets one point per tolerance radians of turning, found
+by probing it at probes points, up to max_points points. Half of a curve's
+points are spread evenly and half follow where it bends, so tight bends
+get dense points and gentle stretches sparse ones.
+Returns a list of (n, 3) arrays at height z, and the alpha of each curve.
+"""
+def sample_outline(table = PARKING_LOT_OUTLINE, tolerance = np.radians(2), probes = 64, max_points = 400, z = 0):
+	kind = np.array([KINDS.index(row[0]) for row in table])
+	on_x = np.array([row[1] == "x" for row in table])
+	a, b, h, k, low, high, alpha = np.array([row[2:] for row in table], dtype = float).T
+	curves = np.arange(len(table))
+
+	# Probe every curve on a coarse grid and measure how much its direction turns
+	probe_t = np.linspace(0, 1, probes + 1)
+	u = low[:, None] + (high - low)[:, None] * probe_t
+	column = lambda values: np.broadcast_to(values[:, None], u.shape)
+	x, y = to_xy(on_x[:, None], u, evaluate(column(kind), column(a), column(b), column(h), column(k), u))
+	heading = np.unwrap(np.arctan2(np.diff(y, axis = 1), np.diff(x, axis = 1)), axis = 1)
+	bend = np.zeros(u.shape)
+	bend[:, 1:-1] = np.abs(np.diff(heading, axis = 1)) # Turning at each interior probe
+	turning = bend.sum(axis = 1)
+	counts = np.clip(np.ceil(turning / tolerance).astype(int) + 1, 2, max_points)
+	counts[kind == KINDS.index("line")] = 2
+
+	# Cumulative share of each curve's points up to every probe, offset by 2 per curve so all curves fit one increasing axis
+	weight = 0.5 / probes + 0.5 * (bend[:, :-1] + bend[:, 1:]) / 2 / np.maximum(turning, 1e-12)[:, None]
+	weight[turning == 0] = 1 / probes
+	share = np.concatenate([np.zeros((len(table), 1)), np.cumsum(weight, axis = 1)], axis = 1)
+	share = share / share[:, -1:] + 2 * curves[:, None]
+
+	# Sample every curve at its own count, all in one flat array
+	curve = np.repeat(curves, counts)
+	ends = np.cumsum(counts)
+	quantile = (np.arange(ends[-1]) - np.repeat(ends - counts, counts)) / np.repeat(counts - 1, counts)
+	t = np.interp(quantile + 2 * curve, share.ravel(), np.tile(probe_t, len(table)))
+	u = low[curve] + (high - low)[curve] * t
+	x, y = to_xy(on_x[curve], u, evaluate(kind[curve], a[curve], b[curve], h[curve], k[curve], u))
+	points = np.column_stack([x, y, np.full_like(x, z)])
+	return np.split(points, ends[:-1]), alpha
@@ -0,0 +1,142 @@
+# Author: Peyton J. Hall
+"""
+A module to move people with a social-force model instead of straight lines.
+Each person is pulled towards where their route schedule says they should
+be, and pushed away from the people and walls close to them, so crowds
+bunch up at the atrium doors and the check-in desk instead of passing
+through each other. No integration substep moves anybody through a wall,
+ends included, though over a whole tick somebody may walk around the end
+of one. Every force is computed for everybody at once.
+"""
+
+import numpy as np
+from SiteGeometry import WALLS
+from FlowField import segment_distance
+
+NEAR_WALL_CELL = 1.0 # Size in meters of the cells marking where walls can matter
+
+"""
+Social-force movement for the people of an AgentStore. The store's own
+step() gives each person's scheduled position; step() here keeps the
+walked positions and velocities apart from it and writes the walked
+positions back into the store. Neighbours come from a SpatialGrid; forces
+between people are only applied within cutoff, past which the push has
+faded to almost nothing. With flow
+(FlowFields), people heading for one of its destinations walk the way its
+field points instead of straight at their scheduled position.
+"""
+class SocialForce:
+	def __init__(self, walls = WALLS, flow = None, radius = 0.3, max_speed = 4.0, catch_up = 1.0, relaxation = 0.5,
+			strength = 2.0, range = 0.3, wall_strength = 10.0, wall_range = 0.2, substep = 0.25):
+		self.walls = np.asarray(walls, dtype = float) # (S, 2, 2) wall segments
+		self.flow = flow # Optional FlowFields routing people around what is in their way
+		self.radius = radius # Body radius in meters
+		self.max_speed = max_speed # Fastest anybody walks, in m/s
+		self.catch_up = catch_up # Seconds a person takes to close the gap to their schedule
+		self.relaxation = relaxation # Seconds a person takes to reach the velocity they want
+		self.strength, self.range = strength, range # Push between people: strength * exp((2 radius - d) / range)
+		self.cutoff = 2 * radius + 3 * range # Distance past which people are too far apart to push each other
+		self.wall_strength, self.wall_range = wall_strength, wall_range # Push from walls, the same way
+		self.substep = substep # Longest integration step in seconds
+		self.position = np.zeros((0, 2)) # Walked (x, y) of each row
+		self.velocity = np.zeros((0, 2)) # Velocity of each row in m/s
+
+		# Cells of the site where a wall is close enough to push somebody or be walked through in one substep;
+		# everybody elsewhere skips the wall tests
+		self.low = -135.0
+		centers = self.low + (np.arange(int(np.ceil(270 / NEAR_WALL_CELL))) + 0.5) * NEAR_WALL_CELL
+		points = np.stack(np.meshgrid(centers, centers), axis = -1)
+		reach = max(radius + 5 * wall_range, max_speed * substep) + NEAR_WALL_CELL * np.sqrt(2) / 2
+		self.near_wall = np.min([segment_distance(points, start, end) for start, end in self.walls], axis = 0) <= reach
+
+	""" Makes room for every row of the store """
+	def _fit(self, capacity):
+		if len(self.position) < capacity:
+			grow = capacity - len(self.position)
+			self.position = np.vstack([self.position, np.zeros((grow, 2))])
+			self.velocity = np.vstack([self.velocity, np.zeros((grow, 2))])
+
+	""" Whether each (x, y) point is in a cell where walls matter """
+	def _near_walls(self, points):
+		column, row = np.clip(((points - self.low) // NEAR_WALL_CELL).astype(np.intp), 0, len(self.near_wall) - 1).T
+		return self.near_wall[row, column]
+
+	""" Push of every wall on every point, summed per point """
+	def _wall_forces(self, points):
+		start, end = self.walls[:, 0], self.walls[:, 1]
+		along = end - start
+		# Closest point of every wall to every point
+		t = np.clip(np.einsum("nsk,sk->ns", points[:, None] - start, along) / np.einsum("sk,sk->s", along, along), 0, 1)
+		away = points[:, None] - (start + t[..., None] * along)
+		distance = np.maximum(np.linalg.norm(away, axis = 2), 1e-6)
+		push = self.wall_strength * np.exp((self.radius - distance) / self.wall_range)
+		push[distance > self.radius + 5 * self.wall_range] = 0 # Walls further away do not matter
+		return np.einsum("ns,nsk->nk", push / distance, away)
+
+	""" Whether each move from before to after passes through a wall, or through one of its ends """
+	def _through_wall(self, before, after):
+		start, end = self.walls[:, 0], self.walls[:, 1]
+		def side(origin, towards, points): # Sign of the side of the line from origin towards that each point is on
+			line, offset = towards - origin, points - origin
+			return np.sign(line[..., 0] * offset[..., 1] - line[..., 1] * offset[..., 0])
+		walls_apart = side(start, end, before[:, None]) * side(start, end, after[:, None]) < 0 # (N, S)
+		move_apart = side(before[:, None], after[:, None], start) * side(before[:, None], after[:, None], end) <= 0 # Ends count as wall
+		return (walls_apart & move_apart).any(axis = 1)
+
+	"""
+	Moves the people of the store for seconds of simulated time. spawned
+	are the rows added since the last call, and grid holds everybody's
+	walked position from the last tick. fields gives the flow field each
+	row of the store follows, or -1 to head straight for the schedule.
+	"""
+	def step(self, people, spawned, grid, seconds, fields = None):
+		self._fit(people.capacity)
+		self.position[spawned] = people.position[spawned, :2] # New people start where their route starts
+		self.velocity[spawned] = 0
+		rows = people.alive_rows()
+		goal = people.position[rows, :2] # Where the schedule wants everybody now
+		position, velocity = self.position[rows], self.velocity[rows]
+		routed = None
+		if self.flow is not None and fields is not None:
+			field = fields[rows]
+			routed = field >= 0
+			field = field[routed]
+
+		# Pairs close enough to push each other, as indices into rows
+		index = np.full(people.capacity, -1)
+		index[rows] = np.arange(len(rows))
+		first, second = grid.pairs(self.cutoff)
+		first, second = index[first], index[second]
+		kept = (first >= 0) & (second >= 0)
+		first, second = first[kept], second[kept]
+
+		substeps = max(1, int(np.ceil(seconds / self.substep)))
+		dt = seconds / substeps
+		for _ in range(substeps):
+			wanted = (goal - position) / self.catch_up
+			speed = np.linalg.norm(wanted, axis = 1, keepdims = True)
+			wanted *= np.minimum(1, self.max_speed / np.maximum(speed, 1e-6))
+			if routed is not None: # Same pace, but along the field
+				wanted[routed] = self.flow.direction(field, position[routed]) * np.minimum(speed[routed], self.max_speed)
+			force = (wanted - velocity) / self.relaxation
+			near = np.flatnonzero(self._near_walls(position))
+			force[near] += self._wall_forces(position[near])
+
+			# Per coordinate, as gathering single columns is much cheaper than gathering (x, y) rows
+			away = [position[first, axis] - position[second, axis] for axis in range(2)]
+			distance = np.maximum(np.sqrt(away[0] * away[0] + away[1] * away[1]), 1e-6)
+			push = self.strength * np.exp((2 * self.radius - distance) / self.range) / distance
+			for axis in range(2): # Equal and opposite push on both people of every pair
+				force[:, axis] += np.bincount(first, push * away[axis], len(rows)) - np.bincount(second, push * away[axis], len(rows))
+
+			velocity += force * dt
+			speed = np.linalg.norm(velocity, axis = 1, keepdims = True)
+			velocity *= np.minimum(1, self.max_speed / np.maximum(speed, 1e-6))
+			moved = position + velocity * dt
+			stopped = near[self._through_wall(position[near], moved[near])] # Pushed hard enough to go through a wall; stop instead
+			moved[stopped] = position[stopped]
+			velocity[stopped] = 0
+			position = moved
+
+		self.position[rows], self.velocity[rows] = position, velocity
+		people.position[rows, :2] = position
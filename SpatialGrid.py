@@ -0,0 +1,132 @@
+# Author: Peyton J. Hall
+"""
+A module to find the people near a point or near each other without
+comparing every pair. The site (building and parking lot) is cut into square
+cells; people are sorted by cell and each cell's count gives its slice, so a query only
+looks at the few cells around it.
+"""
+
+import numpy as np
+
+"""
+Uniform grid over the site, from low to high in both x and y (the extent
+of the 3D axes). Call update() once per tick with the store's positions and
+alive rows; radius(), nearest() and pairs() then answer from the buckets.
+Rows are the store's own row indices. Heights are ignored.
+"""
+class SpatialGrid:
+	def __init__(self, cell_size = 2.0, low = -135.0, high = 135.0):
+		self.cell_size = cell_size
+		self.low = low
+		self.columns = int(np.ceil((high - low) / cell_size)) # Cells along x and along y
+		self.rows = np.empty(0, dtype = np.intp) # Indexed rows, sorted by cell
+		self.points = np.empty((0, 2)) # (x, y) of each indexed row, in the same order
+		self.cells = np.empty(0, dtype = np.intp) # Cell of each indexed row, in the order given to update()
+		self.indexed = np.empty(0, dtype = np.intp) # Rows given to the last update()
+		self.start = np.zeros(self.columns ** 2 + 1, dtype = np.intp) # First sorted entry of every cell
+
+	""" Column and row of the cell holding each (x, y) point; points off the site go to the edge cells """
+	def cell_of(self, points):
+		return np.clip(((points - self.low) // self.cell_size).astype(np.intp), 0, self.columns - 1)
+
+	"""
+	Order that sorts cells, keeping people of the same cell in the order
+	given. Stable sorts of 16-bit keys are radix sorts in NumPy, so this is a
+	counting sort in linear time: one pass over the low 16 bits of the cell
+	numbers, and a second over the high ones only on grids with more cells.
+	"""
+	def _cell_order(self, cells):
+		order = np.argsort(cells.astype(np.uint16), kind = "stable") # Low 16 bits
+		if self.columns ** 2 > 1 << 16:
+			order = order[np.argsort((cells[order] >> 16).astype(np.uint16), kind = "stable")]
+		return order
+
+	"""
+	Re-buckets the given rows of positions. The buckets are only re-sorted
+	when somebody arrived, left or crossed into another cell; otherwise
+	just their coordinates are refreshed.
+	"""
+	def update(self, positions, rows):
+		column, row = self.cell_of(positions[rows, :2]).T
+		cells = row * self.columns + column
+		if not (np.array_equal(rows, self.indexed) and np.array_equal(cells, self.cells)):
+			order = self._cell_order(cells) # People of a cell end up next to each other
+			counts = np.bincount(cells, minlength = self.columns ** 2)
+			self.start[1:] = np.cumsum(counts) # Each cell's slice of the sorted rows
+			self.rows = rows[order]
+			self.indexed, self.cells = rows, cells
+		self.points = positions[self.rows, :2]
+
+	""" Sorted entries of the cells within reach cells of cell (column, row), one slice per row of cells """
+	def _square(self, column, row, reach):
+		left, right = max(column - reach, 0), min(column + reach, self.columns - 1)
+		slices = [
+			np.arange(self.start[line * self.columns + left], self.start[line * self.columns + right + 1])
+			for line in range(max(row - reach, 0), min(row + reach, self.columns - 1) + 1)
+		]
+		return np.concatenate(slices) if slices else np.empty(0, dtype = np.intp)
+
+	""" Rows within distance of (x, y) """
+	def radius(self, x, y, distance):
+		column, row = self.cell_of(np.array([x, y]))
+		entries = self._square(column, row, int(np.ceil(distance / self.cell_size)))
+		offsets = self.points[entries] - (x, y)
+		return self.rows[entries[np.einsum("ij,ij->i", offsets, offsets) <= distance ** 2]]
+
+	"""
+	The k rows closest to (x, y), nearest first. Rings of cells are added
+	until they hold k people; the search is then widened to the distance of
+	the k-th of them, so no closer person in a corner cell is missed.
+	"""
+	def nearest(self, x, y, k = 1):
+		column, row = self.cell_of(np.array([x, y]))
+		reach = 0
+		entries = self._square(column, row, reach)
+		while len(entries) < k and reach < self.columns:
+			reach += 1
+			entries = self._square(column, row, reach)
+		if not len(entries):
+			return entries
+		offsets = self.points[entries] - (x, y)
+		squared = np.einsum("ij,ij->i", offsets, offsets)
+		if len(entries) >= k:
+			widest = np.sqrt(np.partition(squared, k - 1)[k - 1])
+			entries = self._square(column, row, int(np.ceil(widest / self.cell_size)))
+			offsets = self.points[entries] - (x, y)
+			squared = np.einsum("ij,ij->i", offsets, offsets)
+		closest = np.argsort(squared, kind = "stable")[:k]
+		return self.rows[entries[closest]]
+
+	"""
+	Every pair of indexed rows closer than distance, which must not be more
+	than one cell. Each pair appears once. Returns the two arrays of rows.
+	"""
+	def pairs(self, distance):
+		if distance > self.cell_size:
+			raise ValueError(f"Pairs can be found up to the cell size ({self.cell_size} m), not {distance} m.")
+		# 32-bit indices and separate coordinate arrays keep the gathers cheap in crowded cells
+		entries = np.arange(len(self.rows), dtype = np.int32)
+		column, row = self.cell_of(self.points).T
+		x, y = np.ascontiguousarray(self.points[:, 0]), np.ascontiguousarray(self.points[:, 1])
+		first, second = [], []
+		# The cell itself and the 4 neighbours after it, so every pair of cells is visited once
+		for step_x, step_y in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+			other_column, other_row = column + step_x, row + step_y
+			inside = (other_column >= 0) & (other_column < self.columns) & (other_row < self.columns)
+			cell = other_row[inside] * self.columns + other_column[inside]
+			begin, end = self.start[cell].astype(np.int32), self.start[cell + 1].astype(np.int32)
+			if step_x == step_y == 0:
+				begin = entries[inside] + 1 # Only the people after this one in their own cell
+			lengths = np.maximum(end - begin, 0)
+			# Expand each person's range of candidates into explicit pairs
+			here = np.repeat(entries[inside], lengths)
+			there = np.arange(lengths.sum(), dtype = np.int32) - np.repeat(np.cumsum(lengths, dtype = np.int32) - lengths - begin, lengths)
+			along_x, along_y = x[here] - x[there], y[here] - y[there]
+			close = along_x * along_x + along_y * along_y < distance ** 2
+			first.append(here[close])
+			second.append(there[close])
+		return self.rows[np.concatenate(first)], self.rows[np.concatenate(second)]
+
+	""" Number of indexed people in every cell, as a (columns, columns) array indexed [row, column] """
+	def counts(self):
+		return np.diff(self.start).reshape(self.columns, self.columns)
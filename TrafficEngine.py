@@ -0,0 +1,285 @@
+# Author: Peyton J. Hall
+"""
+A module to simulate gym traffic at LifeTime in Savage, Minnesota without drawing it.
+The engine owns spawning, waypoint routing and stepping; nothing here imports
+matplotlib, so full days can be simulated on servers with no display.
+"""
+
+import numpy as np
+from AgentStore import AgentStore
+from PopularTimes import DAYS, load_popular_times
+from SpatialGrid import SpatialGrid
+from SocialForce import SocialForce
+from FlowField import FlowFields
+from SiteGeometry import ZONES, queue_spots
+from DaySummary import day_summary
+
+# Flow field followed towards each key point of a route: 0 for the door (1 for the right-hand one), 2 for the desk
+DOOR, DESK = 0, 2
+ROUTE_FIELDS = np.array([-1, DOOR, DESK] + [-1] * 11 + [DESK, DOOR, -1])
+CHECK_IN_STOP = 2 # Key point of a route where people check in at the desk (position 3)
+# Corners (x min, x max, y min, y max) of the two parts of the lot people park in: QIV and QIII
+PARKING_AREAS = np.array([(5, 106, -100, -14), (-115, -28, -103, -15)])
+GYM_STOPS = 11 # Key points of a route on the gym floor
+# Zone of each route segment: to the door, to the desk, around the gym, back to the door, back to the car
+SEGMENT_ZONES = np.array([0, 1] + [2] * 12 + [1, 0])
+
+"""
+Headless simulation of people walking from the parking lot, through the
+atrium and the check-in desk, around the gym floor and back to their car.
+One call to step() is one tick of the simulation, tick_seconds long.
+Without a day a person arrives every frame_interval ticks; with a day
+(e.g. "monday") people arrive at a rate following that day's Popular Times
+chart, scaled so the busiest hour of the week brings peak_arrivals_per_hour.
+People walk straight between the key points of their route, or with
+social_force they steer along it around each other and the walls. With
+flow_fields as well, they find their way to the doors and the desk
+through shared, precomputed flow fields. With desk (a CheckinQueue),
+people wait in line at the desk on their way in until staff check them in.
+With statistics, occupancy and dwell times are recorded for summary().
+advance() runs the simulation by simulated seconds rather than ticks,
+so a display can show the day at any speed.
+"""
+class GymTrafficEngine:
+	def __init__(self, frame_interval = 50, seed = None, day = None, start_hour = 6, tick_seconds = 1.0, peak_arrivals_per_hour = 300, social_force = False, flow_fields = False, desk = None, statistics = False):
+		self.frame_interval = frame_interval # Ticks between new people, and ticks per route segment
+		self.random = np.random.default_rng(seed) # Independent random stream, so runs can be repeated exactly
+		self.people = AgentStore(waypoint_count = 17) # Every person's route and progress, stored as arrays
+		self.person_counter = 0 # Counter to keep track of the number of people added
+		self.frame = 0 # Number of ticks simulated so far
+		self.spawned = [] # Rows of the people added during the last tick
+		self.day = day
+		self.start_hour = start_hour # Hour of the day the first tick happens at
+		self.tick_seconds = tick_seconds # Simulated seconds per tick
+		self.arrival_rates = None # People arriving per hour, for each hour of the day
+		self.arrival_credit = 0.0 # Fraction of a person owed to the arrival rate so far
+		self.tick_credit = 0.0 # Fraction of a tick owed to advance() so far
+		self.profiler = None # Optional FrameProfiler timing the phases of each tick
+		self.grid = None # Optional SpatialGrid, kept up to date with everybody's position every tick
+		self.heatmap = None # Optional OccupancyHeatmap, given everybody's position every tick
+		self.recorder = None # Optional TrajectoryRecorder, logging everybody's position every tick
+		self.desk = desk # Optional CheckinQueue; without one, checking in takes no time
+		self.line_spots = queue_spots(128) # Where the line stands, grown when it gets longer
+		self.statistics = None # Per-hour arrivals and person-seconds in each zone, peak counts and dwell times
+		if statistics:
+			self.statistics = {"arrivals": np.zeros(24, dtype = int), "person_seconds": np.zeros((len(ZONES), 24)),
+				"peak": np.zeros(len(ZONES), dtype = int), "dwell": []}
+		self.movement = None # Optional model moving people off their straight-line schedule
+		if flow_fields and not social_force:
+			raise ValueError("Flow fields steer the social-force model; pass social_force = True as well.")
+		if social_force:
+			# Doors and desk, as given by position2() and position3()
+			self.movement = SocialForce(flow = FlowFields([(-7/2, -4), (7/2, -4), (0, 0)]) if flow_fields else None)
+			self.grid = SpatialGrid(cell_size = self.movement.cutoff) # Cells no bigger than needed to find the pairs that push
+		if day is not None:
+			busyness = load_popular_times()[DAYS.index(day.lower())]
+			self.arrival_rates = peak_arrivals_per_hour * busyness / 100
+
+	""" Simulated time of day, in seconds after midnight """
+	def clock(self):
+		return self.start_hour * 3600 + self.frame * self.tick_seconds
+
+	""" Simulated hour of the day, 0 to 23 """
+	def hour(self):
+		return int(self.clock() // 3600) % 24
+
+	""" Position 1, where people spawn, is in the parking lot: count points in a random one of its two parts. """
+	def position1(self, count = 1):
+		area = PARKING_AREAS[self.random.integers(len(PARKING_AREAS), size = count)]
+		x = self.random.uniform(area[:, 0], area[:, 1])
+		y = self.random.uniform(area[:, 2], area[:, 3])
+		return np.column_stack([x, y, np.zeros(count)]) # z set to 0
+
+	""" Position 2 is at the outside doors of the atrium, the door on the same side as each start position. """
+	def position2(self, start_pos):
+		return np.where(start_pos[..., :1] > 0, [7/2, -4, 0], [-7/2, -4, 0])
+
+	""" Position 3 is at the front checkin desk. """
+	def position3(self):
+		return np.array([0, 0, 0])
+
+	""" Position 4 is inside the gym: an array of shape + (3,) random points. """
+	def position4(self, shape = ()):
+		x = self.random.uniform(-64, 36, shape) # Random x within range
+		y = self.random.uniform(0, 56.5, shape) # Random y within range
+		return np.stack([x, y, np.zeros(shape)], axis = -1)
+
+	""" Position 5, where people start to leave the gym. """
+	def position5(self):
+		return np.array([0, 0, 0])
+
+	""" Position 6, where people move towards the exit similar to position 2. """
+	def position6(self, start_pos):
+		return self.position2(start_pos)
+
+	""" Position 7, where people return to their spawn point and disappear. """
+	def position7(self, start_pos):
+		return start_pos
+
+	""" Random RGB colors for count new people, one per row """
+	def random_color(self, count = 1):
+		return self.random.random((count, 3))
+
+	"""
+	Adds count new people at position 1 with the key points of their
+	routes, drawing everybody's random points and colors in a few calls.
+	Returns their rows.
+	"""
+	def add_people(self, count):
+		start_pos = self.position1(count)
+		waypoints = np.empty((count, self.people.waypoint_count, 3))
+		waypoints[:, 0] = start_pos
+		waypoints[:, 1] = self.position2(start_pos)
+		waypoints[:, 2] = self.position3()
+		waypoints[:, 3:3 + GYM_STOPS] = self.position4((count, GYM_STOPS)) # Random movements within the gym
+		waypoints[:, -3] = self.position5()
+		waypoints[:, -2] = self.position6(start_pos)
+		waypoints[:, -1] = self.position7(start_pos)
+		self.person_counter += count
+		# Only the key points are kept; each segment takes frame_interval ticks
+		rows = self.people.spawn_many(waypoints, self.random_color(count), self.frame_interval, self.frame)
+		self.spawned.extend(rows.tolist())
+		if self.statistics is not None:
+			self.statistics["arrivals"][self.hour()] += count
+		return rows
+
+	""" Adds a new person at position 1 with the key points of their route, and returns their row """
+	def add_person(self):
+		return int(self.add_people(1)[0])
+
+	""" Flow field each row of the store is following on the segment they are walking, or -1 """
+	def route_fields(self):
+		people = self.people
+		fields = ROUTE_FIELDS[people.waypoint_index[:people.size] + 1] # By the key point being walked to
+		right = people.waypoints[:people.size, 0, 0] > 0 # People parked right of the entrance use the right door
+		return np.where(fields == DOOR, DOOR + right, fields)
+
+	"""
+	Holds the people who just reached the desk in its line, lets the desk
+	serve up to now, and releases whoever was checked in. Everybody waiting
+	stands in line behind the people being served at the desk, at the spots
+	of queue_spots().
+	"""
+	def check_in(self):
+		people = self.people
+		rows = people.alive_rows()
+		time = people.progress[rows] - 1 # Route time the positions were just computed for
+		reached = people.arrival[rows, CHECK_IN_STOP]
+		arrived = rows[~people.held[rows] & (time >= reached) & (time - 1 < reached)]
+		now = self.clock()
+		people.held[arrived] = True
+		self.desk.join(arrived, now)
+		people.held[self.desk.advance(now)] = False
+
+		if self.desk.length > len(self.line_spots):
+			self.line_spots = queue_spots(2 * self.desk.length)
+		people.position[self.desk.line(), :2] = self.line_spots[:self.desk.length] # Across the atrium, then out the door
+		staff = np.flatnonzero(self.desk.serving >= 0) # Side by side in front of the desk
+		people.position[self.desk.serving[staff], :2] = np.column_stack([0.8 * (staff - (self.desk.servers - 1) / 2), np.zeros(len(staff))])
+
+	"""
+	Advances the simulation ticks ticks (one by default): adds the people
+	due, moves everybody, and retires whoever finished. Returns the retired
+	rows, which the next arrivals will reuse; the rows added are left in
+	self.spawned. Several ticks are taken as one coarser step, which the
+	desk and social force cannot do; advance() decides when that is safe.
+	"""
+	def step(self, ticks = 1):
+		if ticks > 1 and (self.desk is not None or self.movement is not None):
+			raise ValueError("The desk and social force move people one tick at a time; step a tick at a time.")
+		profiler = self.profiler
+		self.spawned = []
+		if self.arrival_rates is None:
+			# One person every frame_interval ticks, on the ticks that are multiples of it
+			due = (self.frame + ticks - 1) // self.frame_interval - (self.frame - 1) // self.frame_interval
+			if due:
+				self.add_people(due)
+		else:
+			# Add the people the current hour's arrival rate owes these ticks, all at once
+			self.arrival_credit += self.arrival_rates[self.hour()] * ticks * self.tick_seconds / 3600
+			if self.arrival_credit >= 1:
+				arriving = int(self.arrival_credit)
+				self.add_people(arriving)
+				self.arrival_credit -= arriving
+		if profiler is not None:
+			profiler.lap("spawn")
+		finished = self.people.step(ticks) # Advance every person in a few array operations
+		if self.desk is not None:
+			self.check_in()
+		if self.movement is not None: # Walk towards the scheduled positions instead of onto them
+			self.movement.step(self.people, self.spawned, self.grid, self.tick_seconds, self.route_fields())
+		if profiler is not None:
+			profiler.lap("move")
+		if self.statistics is not None:
+			self.record(finished, ticks)
+		self.people.retire(finished) # Free their rows for the next people to arrive
+		if profiler is not None:
+			profiler.lap("retire")
+		if self.grid is not None:
+			self.grid.update(self.people.position, self.people.alive_rows())
+		if self.heatmap is not None:
+			self.heatmap.add(self.people.position[self.people.alive_rows()], ticks * self.tick_seconds)
+		if self.recorder is not None:
+			self.recorder.record(self)
+		if profiler is not None and (self.grid is not None or self.heatmap is not None or self.recorder is not None):
+			profiler.lap("move")
+		self.frame += ticks
+		return finished
+
+	"""
+	Advances the simulation by seconds of simulated time, whatever the tick
+	length; a fraction of a tick left over is carried to the next call.
+	Ticks are stepped one at a time, so the result is exactly that of
+	calling step() for each. With coalesce they are instead merged into
+	steps of up to one route segment (frame_interval ticks) that never cross
+	the hour, trading exact arrival and departure times within a step for speed; with the
+	desk or social force every tick is still stepped. Returns the rows
+	retired on the way, and leaves the rows added on the way that are still
+	alive in self.spawned.
+	"""
+	def advance(self, seconds, coalesce = False):
+		self.tick_credit += seconds / self.tick_seconds
+		ticks = int(self.tick_credit + 1e-9) # Tolerate rounding, e.g. 0.1 s ticks
+		self.tick_credit = max(0.0, self.tick_credit - ticks)
+		coalesce = coalesce and self.desk is None and self.movement is None
+		finished, spawned = [], []
+		while ticks > 0:
+			chunk = 1
+			if coalesce:
+				to_next_hour = int(np.ceil((3600 - self.clock() % 3600) / self.tick_seconds))
+				chunk = max(1, min(ticks, self.frame_interval, to_next_hour))
+			finished.append(self.step(chunk))
+			spawned.extend(self.spawned)
+			ticks -= chunk
+		self.spawned = [row for row in dict.fromkeys(spawned) if self.people.alive[row]] # Rows reused on the way appear once
+		return np.unique(np.concatenate(finished)) if finished else np.empty(0, dtype = np.intp)
+
+	""" Adds the ticks just stepped to the statistics: who is in which zone, and how long the people leaving stayed """
+	def record(self, finished, ticks = 1):
+		people, statistics = self.people, self.statistics
+		rows = people.alive_rows()
+		zones = np.where(people.held[rows], 1, SEGMENT_ZONES[people.waypoint_index[rows]]) # Anyone held is in line in the atrium
+		counts = np.bincount(zones, minlength = len(ZONES))
+		statistics["person_seconds"][:, self.hour()] += counts * ticks * self.tick_seconds
+		np.maximum(statistics["peak"], counts, out = statistics["peak"])
+		statistics["dwell"].extend(((self.frame + ticks - people.born[finished]) * self.tick_seconds).tolist())
+
+	"""
+	Occupancy and dwell statistics recorded so far (the engine must have
+	been made with statistics = True), as a day_summary() like the one of
+	an EventSimulation.
+	"""
+	def summary(self):
+		if self.statistics is None:
+			raise ValueError("Nothing was recorded; make the engine with statistics = True.")
+		statistics = self.statistics
+		return day_summary(self.day, self.person_counter, statistics["arrivals"], statistics["person_seconds"], statistics["peak"],
+			statistics["dwell"], desk = self.desk)
+
+	""" Simulates the given number of ticks without drawing anything """
+	def run(self, ticks):
+		for _ in range(ticks):
+			if self.profiler is not None:
+				self.profiler.start_frame()
+			self.step()
+		return self
@@ -0,0 +1,149 @@
+# Author: Peyton J. Hall
+"""
+A module to keep a record of every visitor's path through a simulated run.
+The recorder appends each tick's visitors to a binary log of fixed-size
+records, a chunk at a time from a buffer of bounded size, so recording
+hours of simulation uses the same memory as recording a minute. Records
+are in tick order, so the reader memory-maps the log and finds any tick
+with a binary search, reading only the pages it needs.
+"""
+
+import numpy as np
+
+MAGIC = b"GYMTRAJ1"
+VERSION = 1
+
+# Start of every log: what it is and how its ticks map to the time of day
+HEADER = np.dtype([
+	("magic", "S8"),
+	("version", "<u4"),
+	("record_size", "<u4"),
+	("start_clock", "<f8"), # Seconds after midnight of tick 0
+	("tick_seconds", "<f8")
+])
+
+# One visitor on one tick
+RECORD = np.dtype([
+	("tick", "<u4"),
+	("id", "<u4"), # Persistent ID of the visitor, kept from arrival to departure
+	("position", "<f4", (3,)),
+	("color", "u1", (3,)), # RGB, 0 to 255
+	("held", "u1") # 1 while the visitor is standing still, e.g. in line at the desk
+])
+
+"""
+Streams the people of a GymTrafficEngine to a new log at path. Attach it
+as engine.recorder and every tick is added after the engine steps.
+Records are buffered buffer_records at a time; a tick with more people
+than that is written straight through. close() flushes what is left.
+"""
+class TrajectoryRecorder:
+	def __init__(self, path, start_clock = 0.0, tick_seconds = 1.0, buffer_records = 65536):
+		self.path = path
+		self.file = open(path, "wb")
+		header = np.zeros((), dtype = HEADER)
+		header["magic"], header["version"], header["record_size"] = MAGIC, VERSION, RECORD.itemsize
+		header["start_clock"], header["tick_seconds"] = start_clock, tick_seconds
+		self.file.write(header.tobytes())
+		self.buffer = np.zeros(buffer_records, dtype = RECORD)
+		self.length = 0 # Records waiting in the buffer
+		self.records = 0 # Records written or buffered so far
+
+	""" Writes the buffered records to the end of the log """
+	def flush(self):
+		self.file.write(self.buffer[:self.length].tobytes())
+		self.file.flush()
+		self.length = 0
+
+	""" Appends one tick's people: their IDs, (x, y, z) positions, RGB colors from 0 to 1 and held flags """
+	def add(self, tick, ids, positions, colors, held):
+		count = len(ids)
+		if self.length + count > len(self.buffer):
+			self.flush()
+		direct = count > len(self.buffer) # Too many for the buffer; written straight through
+		records = np.zeros(count, dtype = RECORD) if direct else self.buffer[self.length:self.length + count]
+		records["tick"] = tick
+		records["id"] = ids
+		records["position"] = positions
+		records["color"] = np.round(np.asarray(colors) * 255)
+		records["held"] = held
+		if direct:
+			self.file.write(records.tobytes())
+		else:
+			self.length += count
+		self.records += count
+
+	""" Adds everybody alive in the engine on its current tick """
+	def record(self, engine):
+		people = engine.people
+		rows = people.alive_rows()
+		self.add(engine.frame, people.id[rows], people.position[rows], people.color[rows], people.held[rows])
+
+	def close(self):
+		if not self.file.closed:
+			self.flush()
+			self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *error):
+		self.close()
+
+"""
+Reads a log written by TrajectoryRecorder without loading it: the records
+are a read-only memory map. A log cut short (e.g. by a crash) is read up
+to its last whole record.
+"""
+class TrajectoryLog:
+	def __init__(self, path):
+		header = np.fromfile(path, dtype = HEADER, count = 1)
+		if len(header) == 0 or header["magic"][0] != MAGIC:
+			raise ValueError(f"{path} is not a trajectory log.")
+		if header["version"][0] != VERSION or header["record_size"][0] != RECORD.itemsize:
+			raise ValueError(f"{path} was written by an incompatible version of TrajectoryRecorder.")
+		self.start_clock = float(header["start_clock"][0])
+		self.tick_seconds = float(header["tick_seconds"][0])
+		with open(path, "rb") as log:
+			count = (log.seek(0, 2) - HEADER.itemsize) // RECORD.itemsize
+		if count:
+			self.records = np.memmap(path, dtype = RECORD, mode = "r", offset = HEADER.itemsize, shape = (count,))
+		else: # An empty file cannot be memory-mapped
+			self.records = np.zeros(0, dtype = RECORD)
+		self.ticks = self.records["tick"] # Sorted, as ticks are written in order
+
+	def __len__(self):
+		return len(self.records)
+
+	""" First and last tick in the log, or (0, -1) when it is empty """
+	def tick_range(self):
+		if len(self.records) == 0:
+			return 0, -1
+		return int(self.ticks[0]), int(self.ticks[-1])
+
+	"""
+	Indices of the first records of ticks first and last. The keys are given
+	in the dtype of the tick column, so the binary search reads only the few
+	pages it visits instead of converting the whole column.
+	"""
+	def _search(self, first, last):
+		keys = np.clip([first, last], 0, np.iinfo(self.ticks.dtype).max).astype(self.ticks.dtype)
+		return np.searchsorted(self.ticks, keys)
+
+	""" Records of every visitor on tick, a view into the log """
+	def tick(self, tick):
+		first, last = self._search(tick, tick + 1)
+		return self.records[first:last]
+
+	""" Records of the ticks from first up to but not including last """
+	def ticks_between(self, first, last):
+		start, end = self._search(first, last)
+		return self.records[start:end]
+
+	""" Seconds after midnight of tick """
+	def clock(self, tick):
+		return self.start_clock + tick * self.tick_seconds
+
+	""" Every record of one visitor, in tick order; this reads the whole log """
+	def trajectory(self, id):
+		return self.records[self.records["id"] == id]
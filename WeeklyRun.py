@@ -0,0 +1,99 @@
+# Author: Peyton J. Hall
+"""
+A module to simulate the whole week at LifeTime Savage in one batch.
+Each of the seven Popular Times days runs headless in its own worker
+process with its own random streams, split from one seed, and the daily
+occupancy, dwell and desk summaries are merged into one weekly report.
+Days run at the same time, so the week takes about as long as its slowest day
+when there is a core for each. Main.py run is the command line for it.
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PopularTimes import DAYS
+from SiteGeometry import ZONES
+from DaySummary import dwell_minutes
+
+"""
+Simulates one day in this process and returns (summary, dwell seconds of
+everybody who left, wall-clock seconds taken). mode "events" runs an
+EventSimulation; "ticks" runs a GymTrafficEngine from start_hour until the
+end of the day. seeds holds the seed of the simulation and of the desk.
+desk, if given, holds the CheckinQueue arguments.
+"""
+def run_day(day, seeds, mode = "events", desk = None, **options):
+	from CheckinQueue import CheckinQueue
+	started = time.perf_counter()
+	queue = CheckinQueue(**desk, seed = int(seeds[1])) if desk is not None else None
+	if mode == "events":
+		from EventSimulation import EventSimulation
+		simulation = EventSimulation(day, int(seeds[0]), desk = queue, **options).run()
+		summary, dwell = simulation.summary(), simulation.dwell
+	elif mode == "ticks":
+		from TrafficEngine import GymTrafficEngine
+		engine = GymTrafficEngine(seed = int(seeds[0]), day = day, desk = queue, statistics = True, **options)
+		engine.run(int((24 - engine.start_hour) * 3600 / engine.tick_seconds))
+		summary, dwell = engine.summary(), engine.statistics["dwell"]
+	else:
+		raise ValueError(f"Unknown mode {mode!r}; use 'events' or 'ticks'.")
+	return summary, list(dwell), time.perf_counter() - started
+
+"""
+Merges the results of run_day() for every day into one weekly report:
+visitors per day and in total, hourly mean occupancy averaged over the
+days, the highest peak of each zone, dwell percentiles over every visit of
+the week, and desk throughput and waits when there was a desk.
+"""
+def merge_week(results):
+	summaries = {day: summary for day, (summary, dwell, seconds) in results.items()}
+	dwell = np.concatenate([np.asarray(dwell, dtype = float) for summary, dwell, seconds in results.values()])
+	visitors = {day: summary["visitors"] for day, summary in summaries.items()}
+	report = {
+		"visitors": sum(visitors.values()),
+		"visitors_per_day": visitors,
+		"busiest_day": max(visitors, key = visitors.get),
+		"mean_occupancy": {
+			zone: np.mean([summary["mean_occupancy"][zone] for summary in summaries.values()], axis = 0).round(2).tolist()
+			for zone in ZONES
+		},
+		"peak_occupancy": {zone: max(summary["peak_occupancy"][zone] for summary in summaries.values()) for zone in ZONES},
+		"dwell_minutes": dwell_minutes(dwell)
+	}
+	desks = [summary["desk"] for summary in summaries.values() if "desk" in summary]
+	if desks:
+		served = [sum(desk["served_per_hour"]) for desk in desks]
+		report["desk"] = {
+			"served": sum(served),
+			"mean_wait_seconds": float(np.average([desk["wait_seconds"]["mean"] for desk in desks], weights = np.maximum(served, 1))),
+			"max_wait_seconds": max(desk["wait_seconds"]["max"] for desk in desks),
+			"longest_queue": max(max(desk["longest_queue_per_hour"]) for desk in desks)
+		}
+	report["days"] = summaries
+	return report
+
+"""
+Simulates all seven days at once in workers processes (one per day by
+default, capped at the number of cores) and returns the weekly report.
+Each day gets independent random streams spawned from seed, so a seed
+always gives the same week however the days are scheduled. The report
+also records how long the week took next to its slowest day.
+"""
+def run_week(seed = None, mode = "events", workers = None, desk = None, **options):
+	workers = max(1, min(workers or os.cpu_count() or 1, len(DAYS)))
+	streams = np.random.SeedSequence(seed).spawn(len(DAYS))
+	started = time.perf_counter()
+	# Fresh interpreters, as for FrameExport
+	with ProcessPoolExecutor(max_workers = workers, mp_context = multiprocessing.get_context("spawn")) as pool:
+		jobs = {day: pool.submit(run_day, day, stream.generate_state(2), mode, desk, **options) for day, stream in zip(DAYS, streams)}
+		results = {day: job.result() for day, job in jobs.items()} # Re-raises any error from a worker
+	report = merge_week(results)
+	report["seconds"] = {
+		"week": time.perf_counter() - started,
+		"slowest_day": max(seconds for summary, dwell, seconds in results.values()),
+		"workers": workers
+	}
+	return report